@@ -0,0 +1,45 @@
+# poredjenje vremena pripreme poziva funkcije ugovora narudzbine po zahtevu: pravljenje objekta ugovora iz ABI teksta
+# pri svakom zahtevu (kao ranije u /pay, /delivered i /pick_up_order) i objekat iz kesa po adresi ugovora
+# cvor nije potreban, jer se ni u jednom slucaju ne salje nijedan JSON-RPC poziv
+# benchmark se pokrece iz direktorijuma store_management:
+# python benchmarks/contractProxyBenchmark.py [brojZahteva] [brojNarudzbina]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from configuration import getWeb3, abi
+from contractProxies import getOrderContract, getOrderContractCounters
+from eth_account import Account
+
+
+def prepareWithAbiText(orderAddress, orderId):
+    return getWeb3().eth.contract(address=orderAddress, abi=abi).functions.customerPayOrder(orderId)
+
+
+def prepareWithCachedContract(orderAddress, orderId):
+    return getOrderContract(orderAddress).functions.customerPayOrder(orderId)
+
+
+def measure(name, numberOfRequests, orderAddresses, prepare):
+    startTime = time.perf_counter()
+    for requestIndex in range(numberOfRequests):
+        prepare(orderAddresses[requestIndex % len(orderAddresses)], requestIndex)
+    elapsedTime = time.perf_counter() - startTime
+    print(f"{name:<24} {elapsedTime * 1000000 / numberOfRequests:>10.1f} us/request")
+
+
+def main():
+    numberOfRequests = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    numberOfOrders = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    orderAddresses = [Account.create().address for _ in range(numberOfOrders)]
+
+    print(f"{numberOfRequests} requests, {numberOfOrders} orders")
+    measure("abi text per request", numberOfRequests, orderAddresses, prepareWithAbiText)
+    measure("cached contract", numberOfRequests, orderAddresses, prepareWithCachedContract)
+    print(getOrderContractCounters())
+
+
+if __name__ == "__main__":
+    main()
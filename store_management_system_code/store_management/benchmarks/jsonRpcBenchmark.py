@@ -0,0 +1,112 @@
+# poredjenje broja HTTP zahteva ka cvoru za pravljenje i slanje transakcije placanja narudzbine: build_transaction sa
+# posebnim dohvatanjem nonce-a (kao ranije u /pay) i buildContractTransaction preko BatchingHTTPProvider-a
+# ugovori se prvo prevode skriptom solFileCompilationScript.ps1 order.sol, a benchmark se pokrece nad lokalnim
+# razvojnim lancem (npr. ganache) iz direktorijuma store_management:
+# python benchmarks/jsonRpcBenchmark.py [brojPlacanja] [urlCvora]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from eth_account import Account
+from web3 import Web3, HTTPProvider
+from jsonRpcBatching import BatchingHTTPProvider, buildContractTransaction
+
+ORDER_PRICE_IN_WEI = 1000
+
+
+class CountingHTTPProvider(HTTPProvider):
+    def __init__(self, endpoint_uri, **kwargs):
+        super().__init__(endpoint_uri, **kwargs)
+        self.httpRequests = 0
+
+    def make_request(self, method, params):
+        self.httpRequests += 1
+        return super().make_request(method, params)
+
+
+def readFile(filePath):
+    with open(filePath, "r") as file:
+        return file.read()
+
+
+def deployOrderContracts(web3, customerAddress, numberOfOrders):
+    orderContract = web3.eth.contract(
+        bytecode=readFile("./blockchain/output/Order.bin"),
+        abi=readFile("./blockchain/output/Order.abi")
+    )
+    transactionHashes = [
+        orderContract.constructor(customerAddress, ORDER_PRICE_IN_WEI).transact({"from": web3.eth.accounts[0]})
+        for _ in range(numberOfOrders)
+    ]
+    return [
+        web3.eth.wait_for_transaction_receipt(transactionHash).contractAddress for transactionHash in transactionHashes
+    ]
+
+
+def createCustomer(web3):
+    customer = Account.create()
+    web3.eth.wait_for_transaction_receipt(web3.eth.send_transaction({
+        "from": web3.eth.accounts[0],
+        "to": customer.address,
+        "value": web3.to_wei(1, "ether")
+    }))
+    return customer
+
+
+def payWithBuildTransaction(web3, customer, orderContract):
+    transaction = orderContract.functions.customerPayOrder(1).build_transaction({
+        "from": customer.address,
+        "value": ORDER_PRICE_IN_WEI,
+        "nonce": web3.eth.get_transaction_count(customer.address, "pending"),
+        "gasPrice": 21000
+    })
+    signedTransaction = web3.eth.account.sign_transaction(transaction, customer.key)
+    return web3.eth.send_raw_transaction(signedTransaction.rawTransaction)
+
+
+def payWithBatchedRequests(web3, customer, orderContract):
+    transaction = buildContractTransaction(orderContract.functions.customerPayOrder(1), {
+        "from": customer.address,
+        "value": ORDER_PRICE_IN_WEI,
+        "gasPrice": 21000
+    })
+    signedTransaction = web3.eth.account.sign_transaction(transaction, customer.key)
+    return web3.eth.send_raw_transaction(signedTransaction.rawTransaction)
+
+
+def measure(name, provider, customer, orderAddresses, pay):
+    web3 = Web3(provider)
+    abi = readFile("./blockchain/output/Order.abi")
+    startTime = time.perf_counter()
+    startRequests = provider.httpRequests
+    transactionHashes = [
+        pay(web3, customer, web3.eth.contract(address=orderAddress, abi=abi)) for orderAddress in orderAddresses
+    ]
+    requests = provider.httpRequests - startRequests
+    elapsedTime = time.perf_counter() - startTime
+    for transactionHash in transactionHashes:
+        web3.eth.wait_for_transaction_receipt(transactionHash)
+    print(
+        f"{name:<24} {requests / len(orderAddresses):>6.2f} http requests/payment "
+        f"{elapsedTime * 1000 / len(orderAddresses):>8.2f} ms/payment"
+    )
+
+
+def main():
+    numberOfPayments = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    nodeUrl = sys.argv[2] if len(sys.argv) > 2 else "http://127.0.0.1:8545"
+
+    web3 = Web3(HTTPProvider(nodeUrl))
+    customer = createCustomer(web3)
+
+    print(f"{numberOfPayments} payments")
+    measure("build_transaction", CountingHTTPProvider(nodeUrl), customer,
+            deployOrderContracts(web3, customer.address, numberOfPayments), payWithBuildTransaction)
+    measure("batched requests", BatchingHTTPProvider(nodeUrl), customer,
+            deployOrderContracts(web3, customer.address, numberOfPayments), payWithBatchedRequests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# poredjenje potrosnje gasa i latencije kreiranja narudzbina: poseban Order ugovor po narudzbini i minimal proxy kopija
+# jednog Order ugovora po narudzbini
+# benchmark se pokrece nad lokalnim razvojnim lancem (npr. ganache) ili, kada je urlCvora "tester", nad lancem u
+# memoriji (pip install "eth-tester[py-evm]") iz direktorijuma store_management:
+# python benchmarks/orderContractBenchmark.py [brojNarudzbina] [urlCvora]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from orderContracts import getOrderCloneInitCode
+from web3 import Web3, HTTPProvider
+
+ORDER_PRICE_IN_WEI = 1000
+
+
+def readFile(filePath):
+    with open(filePath, "r") as file:
+        return file.read()
+
+
+def waitForReceipts(web3, transactionHashes):
+    return [web3.eth.wait_for_transaction_receipt(transactionHash) for transactionHash in transactionHashes]
+
+
+def measure(web3, sendTransactions):
+    startTime = time.perf_counter()
+    transactionReceipts = waitForReceipts(web3, sendTransactions())
+    elapsedTime = time.perf_counter() - startTime
+    return sum(transactionReceipt.gasUsed for transactionReceipt in transactionReceipts), elapsedTime
+
+
+def benchmarkPerOrderContracts(web3, ownerAddress, customerAddress, numberOfOrders):
+    orderContract = web3.eth.contract(
+        bytecode=readFile("./blockchain/output/Order.bin"),
+        abi=readFile("./blockchain/output/Order.abi")
+    )
+    return measure(web3, lambda: [
+        orderContract.constructor(customerAddress, ORDER_PRICE_IN_WEI).transact({"from": ownerAddress})
+        for _ in range(numberOfOrders)
+    ])
+
+
+def benchmarkOrderClones(web3, ownerAddress, customerAddress, numberOfOrders):
+    orderContract = web3.eth.contract(
+        bytecode=readFile("./blockchain/output/Order.bin"),
+        abi=readFile("./blockchain/output/Order.abi")
+    )
+    transactionHash = orderContract.constructor(ownerAddress, 0).transact({"from": ownerAddress})
+    implementationAddress = web3.eth.wait_for_transaction_receipt(transactionHash).contractAddress
+    orderCloneFactory = web3.eth.contract(
+        abi=[], bytecode=getOrderCloneInitCode(implementationAddress, customerAddress, ORDER_PRICE_IN_WEI)
+    )
+    return measure(web3, lambda: [
+        orderCloneFactory.constructor().transact({"from": ownerAddress}) for _ in range(numberOfOrders)
+    ])
+
+
+def printResult(name, numberOfOrders, result):
+    gasUsed, elapsedTime = result
+    print(f"{name:<32} {gasUsed / numberOfOrders:>12.0f} gas/order {elapsedTime * 1000 / numberOfOrders:>10.2f} ms/order")
+
+
+def main():
+    numberOfOrders = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    nodeUrl = sys.argv[2] if len(sys.argv) > 2 else "http://127.0.0.1:8545"
+
+    if nodeUrl == "tester":
+        from web3 import EthereumTesterProvider
+        web3 = Web3(EthereumTesterProvider())
+    else:
+        web3 = Web3(HTTPProvider(nodeUrl))
+    ownerAddress = web3.eth.accounts[0]
+    customerAddress = web3.eth.accounts[1]
+
+    print(f"{numberOfOrders} orders")
+    printResult("per order contract", numberOfOrders,
+                benchmarkPerOrderContracts(web3, ownerAddress, customerAddress, numberOfOrders))
+    printResult("order clone", numberOfOrders,
+                benchmarkOrderClones(web3, ownerAddress, customerAddress, numberOfOrders))
+
+
+if __name__ == "__main__":
+    main()
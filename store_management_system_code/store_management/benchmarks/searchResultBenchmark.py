@@ -0,0 +1,78 @@
+# poredjenje prethodnog (kvadratnog) sastavljanja odgovora pretrage sa sastavljanjem preko recnika i sa slanjem
+# odgovora kao toka, nad sintetickim katalogom
+# pokretanje: python benchmarks/searchResultBenchmark.py [brojProizvoda]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from searchResults import SearchRow, buildSearchResult, streamSearchResult
+
+NUMBER_OF_CATEGORIES = 500
+MAXIMUM_CATEGORIES_PER_PRODUCT = 3
+# prethodna implementacija je O(redova x proizvoda), pa se meri samo na manjim katalozima
+MAXIMUM_PRODUCTS_FOR_PREVIOUS_IMPLEMENTATION = 10000
+
+
+def buildSearchResultPrevious(searchRows):
+    resultDictionary = {"categories": [], "products": []}
+    for searchResult in searchRows:
+        if searchResult.CategoryName not in resultDictionary["categories"]:
+            resultDictionary["categories"].append(searchResult.CategoryName)
+        productAlreadyAdded = False
+        for product in resultDictionary["products"]:
+            if product["id"] == searchResult.ProductId:
+                productAlreadyAdded = True
+                product["categories"].append(searchResult.CategoryName)
+                break
+        if not productAlreadyAdded:
+            resultDictionary["products"].append({
+                "categories": [searchResult.CategoryName],
+                "id": searchResult.ProductId,
+                "name": searchResult.ProductName,
+                "price": searchResult.ProductPrice
+            })
+    return resultDictionary
+
+
+def createSearchRows(numberOfProducts):
+    randomGenerator = random.Random(0)
+    searchRows = []
+    for productId in range(1, numberOfProducts + 1):
+        categoryIds = randomGenerator.sample(
+            range(NUMBER_OF_CATEGORIES), randomGenerator.randint(1, MAXIMUM_CATEGORIES_PER_PRODUCT)
+        )
+        for categoryId in categoryIds:
+            searchRows.append(SearchRow(
+                productId, f"Product{productId}", round(randomGenerator.uniform(1, 1000), 2), f"Category{categoryId}"
+            ))
+    return searchRows
+
+
+def measure(function, *arguments):
+    startTime = time.perf_counter()
+    result = function(*arguments)
+    return result, time.perf_counter() - startTime
+
+
+def main():
+    productCounts = [int(sys.argv[1])] if len(sys.argv) > 1 else [1000, 10000, 100000]
+    for numberOfProducts in productCounts:
+        searchRows = createSearchRows(numberOfProducts)
+        print(f"{numberOfProducts} products, {len(searchRows)} rows")
+
+        result, duration = measure(buildSearchResult, searchRows)
+        print(f"    dictionary aggregation: {duration * 1000:.1f} ms")
+        _, duration = measure(lambda rows: sum(len(chunk) for chunk in streamSearchResult(rows)), searchRows)
+        print(f"    streamed serialization: {duration * 1000:.1f} ms")
+
+        if numberOfProducts <= MAXIMUM_PRODUCTS_FOR_PREVIOUS_IMPLEMENTATION:
+            previousResult, duration = measure(buildSearchResultPrevious, searchRows)
+            assert previousResult == result
+            print(f"    previous aggregation: {duration * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# meri vreme ucitavanja modula servisa (sve sto se izvrsi pre nego sto servis pocne da prima zahteve) u novom procesu,
+# kako bi se videlo koliko pokretanje zavisi od cvora; cvor se moze zadati kao nedostupan (npr. http://127.0.0.1:9),
+# pa se vidi i da li se servis uopste pokrece dok cvor nije dostupan
+# benchmark se pokrece iz direktorijuma store_management:
+# python benchmarks/startupBenchmark.py [brojPonavljanja] [urlCvora] [modul ...]
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SERVICE_MODULES = ["customerApplication", "courierApplication", "contractDeployer", "eventIndexer"]
+
+
+def measureImport(moduleName, nodeUrl):
+    environment = dict(os.environ, ETHEREUM_NODE_URL=nodeUrl)
+    startTime = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", f"import {moduleName}"], env=environment, capture_output=True, text=True
+    )
+    elapsedTime = time.perf_counter() - startTime
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+    return elapsedTime, ""
+
+
+def main():
+    numberOfRuns = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    nodeUrl = sys.argv[2] if len(sys.argv) > 2 else "http://127.0.0.1:9"
+    moduleNames = sys.argv[3:] if len(sys.argv) > 3 else SERVICE_MODULES
+
+    print(f"{numberOfRuns} runs, node {nodeUrl}")
+    for moduleName in moduleNames:
+        elapsedTimes = []
+        error = ""
+        for _ in range(numberOfRuns):
+            elapsedTime, error = measureImport(moduleName, nodeUrl)
+            if elapsedTime is None:
+                break
+            elapsedTimes.append(elapsedTime)
+        if len(elapsedTimes) < numberOfRuns:
+            print(f"{moduleName:<24} failed: {error}")
+            continue
+        print(
+            f"{moduleName:<24} {statistics.median(elapsedTimes) * 1000:>10.2f} ms median "
+            f"{max(elapsedTimes) * 1000:>10.2f} ms max"
+        )
+
+
+if __name__ == "__main__":
+    main()
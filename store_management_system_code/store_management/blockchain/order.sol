@@ -2,6 +2,8 @@
 pragma solidity ^0.8.2;
 
 contract Order {
+    // init kod minimal proxy kopija (getOrderCloneInitCode u orderContracts.py) upisuje stanje po ovom rasporedu
+    // promenljivih (slotovi 0, 1 i 3), pa se raspored ne sme menjati
     address payable customerEthereumAddress;
     address payable ownerEthereumAddress;
     address payable courierEtheremumAddress;
@@ -77,4 +79,4 @@ contract Order {
         lock = true;
         emit CustomerConfirmedOrderDelivery(orderId);
     }
-}
\ No newline at end of file
+}
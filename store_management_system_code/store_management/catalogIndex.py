@@ -0,0 +1,133 @@
+from models import Product, Category, ProductCategory
+from searchResults import SearchRow
+
+import bisect
+import threading
+import unicodedata
+
+NGRAM_LENGTH = 3
+
+
+def normalizeText(text):
+    # priblizavanje poredjenju u MySQL kolaciji utf8mb4_0900_ai_ci koju koristi LIKE (bez razlike izmedju velikih i
+    # malih slova i bez akcenata)
+    decomposedText = unicodedata.normalize("NFKD", text)
+    return "".join(character for character in decomposedText if not unicodedata.combining(character)).casefold()
+
+
+def getNgrams(text):
+    return {text[index:index + NGRAM_LENGTH] for index in range(len(text) - NGRAM_LENGTH + 1)}
+
+
+class SubstringIndex:
+    # n-gram indeks nad imenima: kandidati za podstring su presek lista svih n-grama upita, a zatim se svaki kandidat
+    # proverava direktno; kraci upiti od NGRAM_LENGTH se proveravaju nad svim imenima
+    def __init__(self):
+        self.normalizedNames = dict()
+        self.postings = dict()
+
+    def add(self, key, name):
+        normalizedName = normalizeText(name)
+        self.normalizedNames[key] = normalizedName
+        for ngram in getNgrams(normalizedName):
+            self.postings.setdefault(ngram, set()).add(key)
+
+    def search(self, query):
+        normalizedQuery = normalizeText(query)
+        if len(normalizedQuery) < NGRAM_LENGTH:
+            return {key for key, normalizedName in self.normalizedNames.items() if normalizedQuery in normalizedName}
+
+        # najpre se uzima najkraca lista, kako bi presek bio sto jeftiniji
+        ngramPostings = sorted((self.postings.get(ngram, set()) for ngram in getNgrams(normalizedQuery)), key=len)
+        candidates = set(ngramPostings[0])
+        for postings in ngramPostings[1:]:
+            candidates &= postings
+            if len(candidates) == 0:
+                break
+        return {key for key in candidates if normalizedQuery in self.normalizedNames[key]}
+
+
+class CatalogIndex:
+    def __init__(self, products, categories, productCategories, version):
+        self.version = version
+        self.products = dict()
+        self.categoryNames = dict()
+        self.productCategoryIds = dict()
+        self.productNameIndex = SubstringIndex()
+        self.categoryNameIndex = SubstringIndex()
+
+        for productId, productName, productPrice in products:
+            self.products[productId] = (productName, productPrice)
+            self.productCategoryIds[productId] = []
+            self.productNameIndex.add(productId, productName)
+        for categoryId, categoryName in categories:
+            self.categoryNames[categoryId] = categoryName
+            self.categoryNameIndex.add(categoryId, categoryName)
+        for productId, categoryId in productCategories:
+            self.productCategoryIds[productId].append(categoryId)
+        self.sortedProductIds = sorted(self.products.keys())
+
+    def getCandidateProductIds(self, productName, afterProductId):
+        # bez uslova nad imenom kandidati se citaju direktno od pozicije kursora, pa cena stranice ne zavisi od
+        # velicine kataloga
+        if productName == "":
+            startIndex = bisect.bisect_right(self.sortedProductIds, afterProductId)
+            return (self.sortedProductIds[index] for index in range(startIndex, len(self.sortedProductIds)))
+        return sorted(
+            productId for productId in self.productNameIndex.search(productName) if productId > afterProductId
+        )
+
+    def search(self, productName, categoryName, afterProductId=0, limit=None):
+        # redovi se vracaju grupisani po proizvodu, u rastucem redosledu id-a proizvoda, najvise za limit proizvoda
+        # posle afterProductId; drugi rezultat govori da li postoji jos proizvoda posle vracenih
+        matchingCategoryIds = self.categoryNameIndex.search(categoryName)
+
+        searchRows = []
+        numberOfProducts = 0
+        for productId in self.getCandidateProductIds(productName, afterProductId):
+            name, price = self.products[productId]
+            productSearchRows = [
+                SearchRow(productId, name, price, self.categoryNames[categoryId])
+                for categoryId in self.productCategoryIds[productId] if categoryId in matchingCategoryIds
+            ]
+            if len(productSearchRows) == 0:
+                continue
+            if limit is not None and numberOfProducts == limit:
+                return searchRows, True
+            searchRows.extend(productSearchRows)
+            numberOfProducts += 1
+        return searchRows, False
+
+
+def loadCatalogIndex(version):
+    products = [(product.id, product.productName, product.productPrice) for product in Product.query.all()]
+    categories = [(category.id, category.categoryName) for category in Category.query.all()]
+    productCategories = [
+        (productCategory.productId, productCategory.categoryId)
+        for productCategory in ProductCategory.query.order_by(ProductCategory.id).all()
+    ]
+    return CatalogIndex(products, categories, productCategories, version)
+
+
+class CatalogIndexHolder:
+    # indeks se gradi pri prvoj pretrazi i ponovo gradi kada vlasnik promeni katalog (verzija "catalog" u bazi);
+    # verzija se proverava najcesce jednom u refreshInterval sekundi
+    def __init__(self, readVersion, refreshInterval):
+        self.readVersion = readVersion
+        self.refreshInterval = refreshInterval
+        self.lock = threading.Lock()
+        # indeks i vreme poslednje provere verzije se objavljuju zajedno, jednom dodelom para
+        self.checkedCatalogIndex = (None, None)
+
+    def get(self, now):
+        catalogIndex, versionCheckedAt = self.checkedCatalogIndex
+        if catalogIndex is not None and now - versionCheckedAt < self.refreshInterval:
+            return catalogIndex
+
+        version = self.readVersion()
+        with self.lock:
+            catalogIndex = self.checkedCatalogIndex[0]
+            if catalogIndex is None or catalogIndex.version != version:
+                catalogIndex = loadCatalogIndex(version)
+            self.checkedCatalogIndex = (catalogIndex, now)
+            return catalogIndex
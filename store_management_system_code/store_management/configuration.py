@@ -1,6 +1,9 @@
+import json
 import os
+import threading
 from datetime import timedelta
-from web3 import Web3, HTTPProvider
+from web3 import Web3
+from jsonRpcBatching import BatchingHTTPProvider
 
 
 def readFile(filePath):
@@ -8,11 +11,10 @@ def readFile(filePath):
         return file.read()
 
 
-web3 = Web3(HTTPProvider("http://ganache:8545"))
 bytecode = readFile("./blockchain/output/Order.bin")
 abi = readFile("./blockchain/output/Order.abi")
-ethereumContract = web3.eth.contract(bytecode=bytecode, abi=abi)
-ownerEthereumAddress = web3.eth.accounts[0]  # receno u tekstu da prvi racun treba dodeliti vlasniku prodavnice
+# ABI se parsira jednom, a ne pri svakom pravljenju objekta ugovora
+orderAbi = json.loads(abi)
 
 
 class Configuration:
@@ -27,5 +29,133 @@ class Configuration:
     DATABASE_PASSWORD = os.environ["DATABASE_PASSWORD"] if "DATABASE_PASSWORD" in os.environ else "root"
     SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{DATABASE_USERNAME}:{DATABASE_PASSWORD}@{DATABASE_URL}/store"
 
+    ETHEREUM_NODE_URL = os.environ["ETHEREUM_NODE_URL"] if "ETHEREUM_NODE_URL" in os.environ else "http://ganache:8545"
+    ETHEREUM_NODE_TIMEOUT = float(os.environ["ETHEREUM_NODE_TIMEOUT"]) \
+        if "ETHEREUM_NODE_TIMEOUT" in os.environ else 10.0
+    # ako nije zadata, adresa vlasnika se cita sa cvora (prvi racun)
+    OWNER_ETHEREUM_ADDRESS = os.environ["OWNER_ETHEREUM_ADDRESS"] if "OWNER_ETHEREUM_ADDRESS" in os.environ else None
+
+    # na koliko sekundi najcesce kupac proverava da li je vlasnik promenio katalog; podrazumevano 0 znaci pri svakoj
+    # pretrazi, pa je izmena kataloga odmah vidljiva, a veca vrednost dozvoljava pretragu staru najvise toliko sekundi
+    CATALOG_INDEX_REFRESH_INTERVAL = float(os.environ["CATALOG_INDEX_REFRESH_INTERVAL"]) \
+        if "CATALOG_INDEX_REFRESH_INTERVAL" in os.environ else 0.0
+
+    # rezultat pretrage sa vise redova (proizvod, kategorija) od ovog broja se salje kao tok, bez pravljenja celog
+    # JSON tela u memoriji
+    SEARCH_STREAMING_THRESHOLD = int(os.environ["SEARCH_STREAMING_THRESHOLD"]) \
+        if "SEARCH_STREAMING_THRESHOLD" in os.environ else 10000
+    # najveci broj proizvoda na jednoj stranici pretrage, veci zahtevani limit se svodi na ovaj
+    SEARCH_MAXIMUM_LIMIT = int(os.environ["SEARCH_MAXIMUM_LIMIT"]) if "SEARCH_MAXIMUM_LIMIT" in os.environ else 1000
+    # najveci broj narudzbina na jednoj stranici /status, veci zahtevani limit se svodi na ovaj
+    STATUS_MAXIMUM_LIMIT = int(os.environ["STATUS_MAXIMUM_LIMIT"]) if "STATUS_MAXIMUM_LIMIT" in os.environ else 1000
+    # "memory" - odgovori na /status se cuvaju u memoriji svakog procesa
+    # "filesystem" - odgovori se cuvaju u direktorijumu STATUS_CACHE_DIRECTORY, koji mogu deliti svi procesi servisa
+    # "none" - odgovori se ne cuvaju, ali se ETag i dalje vraca
+    STATUS_CACHE_BACKEND = os.environ["STATUS_CACHE_BACKEND"] if "STATUS_CACHE_BACKEND" in os.environ else "memory"
+    STATUS_CACHE_SIZE = int(os.environ["STATUS_CACHE_SIZE"]) if "STATUS_CACHE_SIZE" in os.environ else 1024
+    STATUS_CACHE_DIRECTORY = os.environ["STATUS_CACHE_DIRECTORY"] \
+        if "STATUS_CACHE_DIRECTORY" in os.environ else "/tmp/statusCache"
+
+    # kada je ukljuceno, /order samo upisuje narudzbinu (status DEPLOYING), a ugovor u pozadini postavlja
+    # contractDeployer servis koji narudzbinu prebacuje u CREATED kada transakcija bude mine-ovana
+    ASYNCHRONOUS_CONTRACT_DEPLOYMENT = "ASYNCHRONOUS_CONTRACT_DEPLOYMENT" in os.environ
+    CONTRACT_DEPLOYER_BATCH_SIZE = int(os.environ["CONTRACT_DEPLOYER_BATCH_SIZE"]) \
+        if "CONTRACT_DEPLOYER_BATCH_SIZE" in os.environ else 50
+    CONTRACT_DEPLOYER_POLL_INTERVAL = float(os.environ["CONTRACT_DEPLOYER_POLL_INTERVAL"]) \
+        if "CONTRACT_DEPLOYER_POLL_INTERVAL" in os.environ else 0.5
+    # transakcija koja ni posle ovoliko sekundi nije mine-ovana smatra se izgubljenom (npr. cvor je restartovan), pa
+    # contractDeployer ponovo postavlja ugovor; hes izgubljene transakcije se pamti i njena potvrda se i dalje proverava
+    CONTRACT_DEPLOYER_RECEIPT_TIMEOUT = float(os.environ["CONTRACT_DEPLOYER_RECEIPT_TIMEOUT"]) \
+        if "CONTRACT_DEPLOYER_RECEIPT_TIMEOUT" in os.environ else 600.0
+    # bez asinhronog postavljanja, narudzbinu koja je i posle ovoliko sekundi u statusu DEPLOYING bez hesa transakcije
+    # (zahtev /order je prekinut pre slanja ugovora) postavlja contractDeployer
+    CONTRACT_DEPLOYER_ADOPTION_DELAY = float(os.environ["CONTRACT_DEPLOYER_ADOPTION_DELAY"]) \
+        if "CONTRACT_DEPLOYER_ADOPTION_DELAY" in os.environ else 60.0
+
+    # kada je ukljuceno, nonce-ove transakcija vlasnika prodavnice dodeljuje brojac u tabeli noncereservations
+    # (zajednicki za sve procese i servise), pa vise transakcija vlasnika moze istovremeno biti poslato, umesto da
+    # nonce dodeljuje cvor
+    OWNER_NONCE_MANAGER = "OWNER_NONCE_MANAGER" in os.environ
+    OWNER_TRANSACTION_ATTEMPTS = int(os.environ["OWNER_TRANSACTION_ATTEMPTS"]) \
+        if "OWNER_TRANSACTION_ATTEMPTS" in os.environ else 3
+    # brojac koji ovoliko sekundi prednjaci nonce-u koji cvor ocekuje, a vlasnik nema transakcija na cekanju, ima
+    # prazninu (dodeljen nonce koji nikad nije poslat), pa ga contractDeployer vraca na nonce koji cvor ocekuje
+    OWNER_NONCE_GAP_TIMEOUT = float(os.environ["OWNER_NONCE_GAP_TIMEOUT"]) \
+        if "OWNER_NONCE_GAP_TIMEOUT" in os.environ else 30.0
+
+    # potvrde transakcija u svakom procesu ceka jedna nit koja na svakih RECEIPT_WATCHER_POLL_INTERVAL sekundi
+    # proverava nove blokove; posle RECEIPT_WATCHER_TIMEOUT sekundi cekanje se prekida sa TimeExhausted
+    RECEIPT_WATCHER_POLL_INTERVAL = float(os.environ["RECEIPT_WATCHER_POLL_INTERVAL"]) \
+        if "RECEIPT_WATCHER_POLL_INTERVAL" in os.environ else 0.1
+    RECEIPT_WATCHER_TIMEOUT = float(os.environ["RECEIPT_WATCHER_TIMEOUT"]) \
+        if "RECEIPT_WATCHER_TIMEOUT" in os.environ else 120.0
+
+    # kada je ukljuceno, /pay, /delivered i /pick_up_order vracaju odgovor cim je transakcija poslata, a status
+    # narudzbine menja eventIndexer servis na osnovu dogadjaja ugovora
+    ORDER_STATUS_FROM_EVENTS = "ORDER_STATUS_FROM_EVENTS" in os.environ
+    # blokovi se citaju u grupama od najvise EVENT_INDEXER_BATCH_SIZE blokova, a blok se obradjuje tek kada iznad njega
+    # postoji EVENT_INDEXER_CONFIRMATIONS blokova
+    EVENT_INDEXER_BATCH_SIZE = int(os.environ["EVENT_INDEXER_BATCH_SIZE"]) \
+        if "EVENT_INDEXER_BATCH_SIZE" in os.environ else 1000
+    EVENT_INDEXER_CONFIRMATIONS = int(os.environ["EVENT_INDEXER_CONFIRMATIONS"]) \
+        if "EVENT_INDEXER_CONFIRMATIONS" in os.environ else 0
+    EVENT_INDEXER_POLL_INTERVAL = float(os.environ["EVENT_INDEXER_POLL_INTERVAL"]) \
+        if "EVENT_INDEXER_POLL_INTERVAL" in os.environ else 1.0
+
+    # broj procesa koji desifruju kljuceve kupaca i najveci broj desifrovanja koja u jednom procesu servisa mogu
+    # istovremeno cekati ili se izvrsavati, preko tog broja zahtev se odbija sa 503
+    KEYSTORE_DECRYPTION_PROCESSES = int(os.environ["KEYSTORE_DECRYPTION_PROCESSES"]) \
+        if "KEYSTORE_DECRYPTION_PROCESSES" in os.environ else 2
+    KEYSTORE_DECRYPTION_QUEUE_LIMIT = int(os.environ["KEYSTORE_DECRYPTION_QUEUE_LIMIT"]) \
+        if "KEYSTORE_DECRYPTION_QUEUE_LIMIT" in os.environ else 8
+
+    # najveci broj rezultata provera poziva ugovora (eth_call pre slanja transakcije) koji se cuvaju u kesu
+    PREFLIGHT_CACHE_SIZE = int(os.environ["PREFLIGHT_CACHE_SIZE"]) if "PREFLIGHT_CACHE_SIZE" in os.environ else 1024
+    # najveci broj objekata postavljenih ugovora narudzbina koji se cuvaju izmedju zahteva
+    CONTRACT_PROXY_CACHE_SIZE = int(os.environ["CONTRACT_PROXY_CACHE_SIZE"]) \
+        if "CONTRACT_PROXY_CACHE_SIZE" in os.environ else 1024
+
+    # "perOrder" - za svaku narudzbinu se postavlja poseban Order ugovor
+    # "clone" - za svaku narudzbinu se postavlja minimal proxy (EIP-1167) kopija jednog Order ugovora (adresa iz
+    # ORDER_IMPLEMENTATION_ADDRESS ili ugovor koji se postavlja pri prvoj narudzbini i pamti u tabeli deployedcontracts)
+    ORDER_CONTRACT_MODE = os.environ["ORDER_CONTRACT_MODE"] if "ORDER_CONTRACT_MODE" in os.environ else "perOrder"
+    ORDER_IMPLEMENTATION_ADDRESS = os.environ["ORDER_IMPLEMENTATION_ADDRESS"] \
+        if "ORDER_IMPLEMENTATION_ADDRESS" in os.environ else None
+
     JWT_SECRET_KEY = "JWT_SECRET_KEY"
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+
+
+# veza sa cvorom, fabrika Order ugovora i adresa vlasnika se prave pri prvom koriscenju, a ne pri ucitavanju modula,
+# pa servisi mogu da se pokrenu i da opsluzuju zahteve koji ne koriste blockchain i dok cvor nije dostupan; neuspelo
+# pravljenje se ne pamti, pa se ponavlja pri sledecem koriscenju
+blockchainClientsLock = threading.RLock()
+blockchainClients = dict()
+
+
+def getBlockchainClient(name, createBlockchainClient):
+    with blockchainClientsLock:
+        if name not in blockchainClients:
+            blockchainClients[name] = createBlockchainClient()
+        return blockchainClients[name]
+
+
+def getWeb3():
+    # nezavisni JSON-RPC pozivi se mogu poslati jednim HTTP zahtevom (makeBatchRequest), a id lanca i kod postavljenih
+    # ugovora se dohvataju samo jednom
+    return getBlockchainClient("web3", lambda: Web3(BatchingHTTPProvider(
+        Configuration.ETHEREUM_NODE_URL, request_kwargs={"timeout": Configuration.ETHEREUM_NODE_TIMEOUT}
+    )))
+
+
+def getOrderContractFactory():
+    return getBlockchainClient("orderContractFactory", lambda: getWeb3().eth.contract(bytecode=bytecode, abi=orderAbi))
+
+
+def getOwnerEthereumAddress():
+    return getBlockchainClient(
+        "ownerEthereumAddress",
+        lambda: Web3.to_checksum_address(Configuration.OWNER_ETHEREUM_ADDRESS)
+        if Configuration.OWNER_ETHEREUM_ADDRESS is not None
+        else getWeb3().eth.accounts[0]  # receno u tekstu da prvi racun treba dodeliti vlasniku prodavnice
+    )
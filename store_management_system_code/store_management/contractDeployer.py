@@ -0,0 +1,146 @@
+from flask import Flask
+from configuration import Configuration, getWeb3
+from models import database, Order
+from dataVersions import bumpDataVersions, getBuyerDataVersionName
+from orderContracts import createOrderContract, getOrderContractAddress
+from orderTransitions import updateOrder
+from ownerTransactions import repairOwnerNonceGap
+from sqlalchemy import and_, asc
+from web3.exceptions import TransactionNotFound
+from datetime import datetime, timedelta
+from math import ceil
+import sys
+import time
+
+# pozadinski servis koji postavlja ugovore za narudzbine u statusu DEPLOYING (kada je ukljuceno
+# ASYNCHRONOUS_CONTRACT_DEPLOYMENT, a inace samo za narudzbine ciji je zahtev /order prekinut); hes transakcije se
+# upisuje uz narudzbinu, pa posle restarta servis nastavlja da ceka vec poslate transakcije umesto da ponovo postavlja
+# ugovore
+# servis treba pokretati u jednoj instanci
+
+application = Flask(__name__)
+application.config.from_object(Configuration)
+
+
+def submitDeployments():
+    deploymentCondition = and_(Order.orderStatus == "DEPLOYING", Order.ethereumTransactionHash.is_(None))
+    if not Configuration.ASYNCHRONOUS_CONTRACT_DEPLOYMENT:
+        # bez asinhronog postavljanja ugovor postavlja sam zahtev /order, pa servis preuzima samo narudzbine ciji je
+        # zahtev prekinut pre slanja ugovora
+        deploymentCondition = and_(deploymentCondition, Order.orderCreationTime < datetime.utcnow() - timedelta(
+            seconds=Configuration.CONTRACT_DEPLOYER_ADOPTION_DELAY
+        ))
+
+    ordersForDeployment = Order.query.filter(
+        deploymentCondition
+    ).order_by(
+        asc(Order.id)
+    ).limit(Configuration.CONTRACT_DEPLOYER_BATCH_SIZE).all()
+
+    for orderForDeployment in ordersForDeployment:
+        transactionHash = createOrderContract(
+            orderForDeployment.customerEthereumAddress, ceil(orderForDeployment.totalOrderPrice)
+        )
+        orderForDeployment.ethereumTransactionHash = transactionHash.hex()
+        orderForDeployment.ethereumTransactionTime = datetime.utcnow()
+        database.session.commit()
+
+
+def getDeploymentCondition(transactionHash):
+    # narudzbine se menjaju uslovnim UPDATE naredbama, pa narudzbina koju je u medjuvremenu zavrsio sam zahtev /order
+    # (ili ciji je hes vec promenjen) ostaje nepromenjena
+    orders = Order.__table__
+    return and_(orders.c.orderStatus == "DEPLOYING", orders.c.ethereumTransactionHash == transactionHash)
+
+
+def getDeploymentReceipt(transactionHash):
+    try:
+        return getWeb3().eth.get_transaction_receipt(transactionHash)
+    except TransactionNotFound:
+        return None
+
+
+def getPreviousTransactionHashes(orderBeingDeployed):
+    if orderBeingDeployed.ethereumPreviousTransactionHashes is None:
+        return []
+    return orderBeingDeployed.ethereumPreviousTransactionHashes.split(",")
+
+
+def findDeploymentReceipt(orderBeingDeployed):
+    # izgubljena transakcija moze biti mine-ovana i posle ponovnog slanja, pa se ugovor narudzbine uzima iz prve
+    # uspesne transakcije, redom kojim su poslate; vraca se i potvrda poslednje transakcije
+    transactionReceipt = None
+    for transactionHash in getPreviousTransactionHashes(orderBeingDeployed) + [
+        orderBeingDeployed.ethereumTransactionHash
+    ]:
+        transactionReceipt = getDeploymentReceipt(transactionHash)
+        if transactionReceipt is not None and transactionReceipt.status == 1:
+            return transactionReceipt, transactionReceipt
+    return None, transactionReceipt
+
+
+def collectDeploymentReceipts():
+    ordersBeingDeployed = database.session.query(
+        Order.id, Order.buyerEmail, Order.ethereumTransactionHash, Order.ethereumTransactionTime,
+        Order.ethereumPreviousTransactionHashes
+    ).filter(
+        and_(Order.orderStatus == "DEPLOYING", Order.ethereumTransactionHash.isnot(None))
+    ).order_by(
+        asc(Order.id)
+    ).limit(Configuration.CONTRACT_DEPLOYER_BATCH_SIZE).all()
+
+    receiptDeadline = datetime.utcnow() - timedelta(seconds=Configuration.CONTRACT_DEPLOYER_RECEIPT_TIMEOUT)
+    deployedOrderBuyerEmails = set()
+    for orderBeingDeployed in ordersBeingDeployed:
+        deploymentCondition = getDeploymentCondition(orderBeingDeployed.ethereumTransactionHash)
+        deploymentReceipt, transactionReceipt = findDeploymentReceipt(orderBeingDeployed)
+        if deploymentReceipt is not None:
+            if updateOrder(
+                orderBeingDeployed.id, deploymentCondition,
+                orderStatus="CREATED", ethereumContractAddress=getOrderContractAddress(deploymentReceipt)
+            ):
+                deployedOrderBuyerEmails.add(orderBeingDeployed.buyerEmail)
+            continue
+        if transactionReceipt is not None:
+            # postavljanje nije uspelo, ugovor ce biti ponovo poslat u sledecem prolazu
+            updateOrder(
+                orderBeingDeployed.id, deploymentCondition,
+                ethereumTransactionHash=None, ethereumTransactionTime=None
+            )
+        elif orderBeingDeployed.ethereumTransactionTime is None:
+            # transakcija je poslata pre uvodjenja kolone ethereumTransactionTime, rok pocinje od sada
+            updateOrder(orderBeingDeployed.id, deploymentCondition, ethereumTransactionTime=datetime.utcnow())
+        elif orderBeingDeployed.ethereumTransactionTime < receiptDeadline:
+            # transakcija koja predugo nije mine-ovana se ponovo salje u sledecem prolazu, a njen hes se pamti
+            updateOrder(
+                orderBeingDeployed.id, deploymentCondition,
+                ethereumTransactionHash=None, ethereumTransactionTime=None,
+                ethereumPreviousTransactionHashes=",".join(
+                    getPreviousTransactionHashes(orderBeingDeployed) + [orderBeingDeployed.ethereumTransactionHash]
+                )
+            )
+
+    # kolicine narudzbine su u statistici od njenog upisa, pa postavljanje ugovora menja samo narudzbine kupaca
+    bumpDataVersions([getBuyerDataVersionName(buyerEmail) for buyerEmail in deployedOrderBuyerEmails])
+    database.session.commit()
+
+
+def runContractDeployer():
+    ownerNonceGap = None
+    while True:
+        try:
+            if Configuration.OWNER_NONCE_MANAGER:
+                ownerNonceGap = repairOwnerNonceGap(ownerNonceGap, time.monotonic())
+            submitDeployments()
+            collectDeploymentReceipts()
+        except Exception as exception:
+            database.session.rollback()
+            print(f"Contract deployment failed: {exception}", file=sys.stderr)
+        database.session.remove()
+        time.sleep(Configuration.CONTRACT_DEPLOYER_POLL_INTERVAL)
+
+
+if __name__ == "__main__":
+    database.init_app(application)
+    with application.app_context():
+        runContractDeployer()
@@ -0,0 +1,38 @@
+from configuration import Configuration, getWeb3, orderAbi
+from collections import OrderedDict
+from web3 import Web3
+import threading
+
+# web3.eth.contract pri svakom pozivu ponovo obradjuje ABI i pravi klase za sve funkcije i dogadjaje ugovora, pa se
+# objekti postavljenih Order ugovora cuvaju po adresi i koriste u svim zahtevima; objekat ugovora ne cuva stanje
+# lanca, pa ga nije potrebno osvezavati
+
+orderContractsLock = threading.Lock()
+orderContracts = OrderedDict()
+orderContractCounters = {
+    "hits": 0,
+    "misses": 0
+}
+
+
+def getOrderContract(contractAddress):
+    contractAddress = Web3.to_checksum_address(contractAddress)
+    with orderContractsLock:
+        if contractAddress in orderContracts:
+            orderContracts.move_to_end(contractAddress)
+            orderContractCounters["hits"] += 1
+            return orderContracts[contractAddress]
+        orderContractCounters["misses"] += 1
+
+    orderContract = getWeb3().eth.contract(address=contractAddress, abi=orderAbi)
+    with orderContractsLock:
+        orderContracts[contractAddress] = orderContract
+        orderContracts.move_to_end(contractAddress)
+        while len(orderContracts) > Configuration.CONTRACT_PROXY_CACHE_SIZE:
+            orderContracts.popitem(last=False)
+    return orderContract
+
+
+def getOrderContractCounters():
+    with orderContractsLock:
+        return dict(orderContractCounters, cachedContracts=len(orderContracts))
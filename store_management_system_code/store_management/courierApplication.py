@@ -1,10 +1,17 @@
 from flask import Flask, request, jsonify, Response
-from configuration import Configuration, web3, abi, ownerEthereumAddress
+from configuration import Configuration, getOwnerEthereumAddress
+from web3 import Web3
 from models import database, Order
 from flask_jwt_extended import JWTManager, jwt_required
 from decorators import roleCheck
 from web3.exceptions import ContractLogicError
+from orderTransitions import markOrderPickedUp
+from receiptWatcher import waitForTransactionReceipt, receiptWatcher
+from ownerTransactions import transactAsOwner
+from preflightChecks import preflightContractCall
+from contractProxies import getOrderContract, getOrderContractCounters
 
+OWNER_ROLE_ID_STRING = "2"
 COURIER_ROLE_ID_STRING = "3"
 
 application = Flask(__name__)
@@ -20,6 +27,17 @@ def orders_to_deliver():
     return jsonify(getUndeliveredOrders()), 200
 
 
+@application.route("/metrics", methods=["GET"])
+@jwt_required()
+@roleCheck(OWNER_ROLE_ID_STRING)
+def metrics():
+    # brojaci se vode posebno u svakom procesu servisa, pa se vracaju brojaci procesa koji je primio zahtev
+    return jsonify(
+        receiptWatcher=receiptWatcher.getCounters(),
+        orderContracts=getOrderContractCounters()
+    ), 200
+
+
 @application.route("/pick_up_order", methods=["POST"])
 @jwt_required()
 @roleCheck(COURIER_ROLE_ID_STRING)
@@ -28,7 +46,9 @@ def pick_up_order():
     if len(errorMessage) > 0:
         return jsonify(message=errorMessage), errorCode
 
-    confirmOrderPickUp(orderForPickUp)
+    # inace status menja indekser dogadjaja kada transakcija bude mine-ovana
+    if not Configuration.ORDER_STATUS_FROM_EVENTS:
+        confirmOrderPickUp(orderForPickUp)
 
     return Response(status=200)
 
@@ -52,22 +72,27 @@ def validatePickUpOrderRequest():
     orderForPickUp = Order.query.filter(Order.id == orderId).first()
     if not orderForPickUp:
         return "Invalid order id.", 400, None
-    if orderForPickUp.orderStatus == "PENDING" or orderForPickUp.orderStatus == "COMPLETE":
+    if orderForPickUp.orderStatus != "CREATED":
         return "Invalid order id.", 400, None
     ethereumCourierAddress = request.json.get("address", None)
     if ethereumCourierAddress is None or ethereumCourierAddress == "":
         return "Missing address.", 400, None
-    if not web3.is_address(ethereumCourierAddress):
+    if not Web3.is_address(ethereumCourierAddress):
         return "Invalid address.", 400, None
 
-    ethereumContractDeployed = web3.eth.contract(address=orderForPickUp.ethereumContractAddress, abi=abi)
+    ethereumContractDeployed = getOrderContract(orderForPickUp.ethereumContractAddress)
+    courierPickUpOrder = ethereumContractDeployed.functions.courierPickUpOrder(ethereumCourierAddress, orderId)
+    # poziv koji bi ugovor odbio se odbija pre nego sto se transakcija potpise i posalje
+    errorMessage = preflightContractCall(courierPickUpOrder, {
+        "from": getOwnerEthereumAddress()
+    })
+    if len(errorMessage) > 0:
+        return errorMessage, 400, None
     try:
-        transactionHash = ethereumContractDeployed.functions.courierPickUpOrder(
-            ethereumCourierAddress, orderId
-        ).transact({
-            "from": ownerEthereumAddress  # receno u tekstu da vlasnik snosi troskove vezivanja kurira za ugovor
-        })
-        web3.eth.wait_for_transaction_receipt(transactionHash)
+        # receno u tekstu da vlasnik snosi troskove vezivanja kurira za ugovor
+        transactionHash = transactAsOwner(courierPickUpOrder)
+        if not Configuration.ORDER_STATUS_FROM_EVENTS:
+            waitForTransactionReceipt(transactionHash)
     except ContractLogicError as contractLogicError:
         contractLogicErrorString = str(contractLogicError)
         return contractLogicErrorString[contractLogicErrorString.find("revert ") + 7:], 400, None
@@ -76,7 +101,7 @@ def validatePickUpOrderRequest():
 
 
 def confirmOrderPickUp(orderForPickUp):
-    orderForPickUp.orderStatus = "PENDING"
+    markOrderPickedUp(orderForPickUp.id)
     database.session.commit()
 
 
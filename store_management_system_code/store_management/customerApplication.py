@@ -1,28 +1,66 @@
 from flask import Flask, request, jsonify, Response
-from configuration import Configuration, web3, ethereumContract, ownerEthereumAddress, abi
+from configuration import Configuration, getWeb3
+from web3 import Web3
 from models import database, Product, Category, Order, ProductOrder, ProductCategory
 from flask_jwt_extended import JWTManager, jwt_required, get_jwt, get_jwt_identity
 from datetime import datetime, timezone
 from sqlalchemy import and_, asc
-from web3 import Account
 from web3.exceptions import ContractLogicError
 from math import ceil
 import json
+import time
 from decorators import roleCheck
+from salesStatistics import addOrderedQuantities
+from orderTransitions import markOrderPaid, markOrderDelivered, updateOrder
+from dataVersions import bumpDataVersion, getDataVersion, STORE_DATA_VERSION, CATALOG_DATA_VERSION
+from dataVersions import getBuyerDataVersionName
+from catalogIndex import CatalogIndexHolder
+from receiptWatcher import waitForTransactionReceipt, receiptWatcher
+from orderContracts import createOrderContract, getOrderContractAddress
+from keystoreDecryption import decryptPrivateKey, getDecryptionMetrics, KeystoreDecryptionBusy
+from concurrent.futures.process import BrokenProcessPool
+from jsonRpcBatching import buildContractTransaction
+from preflightChecks import preflightContractCall
+from signedTransactions import sendSignedOrderTransaction
+from contractProxies import getOrderContract, getOrderContractCounters
+from statusCache import createStatusCache, getStatusCacheKey, getStatusEntityTag
+from orderStatuses import getOrderStatuses, parseOrderTime, decodeOrderCursor, ORDER_STATUSES
+from searchResults import buildSearchResult, streamSearchResult, encodeSearchCursor, decodeSearchCursor
 
 CUSTOMER_ROLE_ID_STRING = "1"
+OWNER_ROLE_ID_STRING = "2"
 
 application = Flask(__name__)
 application.config.from_object(Configuration)
 
 jwt = JWTManager(application)
 
+statusCache = createStatusCache()
+
+catalogIndexHolder = CatalogIndexHolder(
+    lambda: getDataVersion(CATALOG_DATA_VERSION), Configuration.CATALOG_INDEX_REFRESH_INTERVAL
+)
+
 
 @application.route("/search", methods=["GET"])
 @jwt_required()
 @roleCheck(CUSTOMER_ROLE_ID_STRING)
 def search():
-    return jsonify(getSearchResult()), 200
+    errorMessage, errorCode, afterProductId, limit = validateSearchRequest()
+    if len(errorMessage) > 0:
+        return jsonify(message=errorMessage), errorCode
+
+    searchRows, hasMoreProducts = getSearchRows(afterProductId, limit)
+    # kursor za sledecu stranicu se vraca samo kada je klijent trazio stranicenje
+    paginationFields = dict()
+    if limit is not None:
+        paginationFields["cursor"] = encodeSearchCursor(searchRows[-1].ProductId) if hasMoreProducts else None
+
+    if len(searchRows) > Configuration.SEARCH_STREAMING_THRESHOLD:
+        return Response(streamSearchResult(searchRows, paginationFields), status=200, mimetype="application/json")
+    searchResult = buildSearchResult(searchRows)
+    searchResult.update(paginationFields)
+    return jsonify(searchResult), 200
 
 
 @application.route("/order", methods=["POST"])
@@ -43,7 +81,41 @@ def order():
 @jwt_required()
 @roleCheck(CUSTOMER_ROLE_ID_STRING)
 def status():
-    return jsonify(getOrderStatuses()), 200
+    errorMessage, errorCode, orderStatuses, sinceTime, afterOrderId, limit, summary = validateStatusRequest()
+    if len(errorMessage) > 0:
+        return jsonify(message=errorMessage), errorCode
+
+    # verzija se cita pre racunanja odgovora, pa se odgovor nikad ne cuva uz noviju verziju od one za koju je izracunat
+    buyerEmail = get_jwt_identity()
+    buyerDataVersion = getDataVersion(getBuyerDataVersionName(buyerEmail))
+    cacheKey = getStatusCacheKey(buyerEmail, request.args)
+    entityTag = getStatusEntityTag(cacheKey, buyerDataVersion)
+    if request.if_none_match.contains(entityTag):
+        response = Response(status=304)
+    else:
+        responseBody = statusCache.get(cacheKey, buyerDataVersion)
+        if responseBody is None:
+            responseBody = jsonify(
+                getOrderStatuses(buyerEmail, orderStatuses, sinceTime, afterOrderId, limit, summary)
+            ).get_data(as_text=True)
+            statusCache.set(cacheKey, buyerDataVersion, responseBody)
+        response = Response(responseBody, status=200, mimetype="application/json")
+    response.set_etag(entityTag)
+    # odgovor zavisi od kupca, pa ga deljeni kesevi ne smeju cuvati, a klijent ga pre svake upotrebe proverava
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@application.route("/metrics", methods=["GET"])
+@jwt_required()
+@roleCheck(OWNER_ROLE_ID_STRING)
+def metrics():
+    # brojaci se vode posebno u svakom procesu servisa, pa se vracaju brojaci procesa koji je primio zahtev
+    return jsonify(
+        keystoreDecryption=getDecryptionMetrics(),
+        receiptWatcher=receiptWatcher.getCounters(),
+        orderContracts=getOrderContractCounters()
+    ), 200
 
 
 @application.route("/delivered", methods=["POST"])
@@ -54,7 +126,9 @@ def delivered():
     if len(errorMessage) > 0:
         return jsonify(message=errorMessage), errorCode
 
-    confirmOrderDelivery(orderForDeliveryConfirmation)
+    # inace status menja indekser dogadjaja kada transakcija bude mine-ovana
+    if not Configuration.ORDER_STATUS_FROM_EVENTS:
+        confirmOrderDelivery(orderForDeliveryConfirmation)
 
     return Response(status=200)
 
@@ -63,32 +137,47 @@ def delivered():
 @jwt_required()
 @roleCheck(CUSTOMER_ROLE_ID_STRING)
 def pay():
-    errorMessage, errorCode, orderForPayment, ethereumKeys, ethereumPassphrase = validatePayRequest()
+    errorMessage, errorCode, orderForPayment, ethereumKeys, ethereumPassphrase, signedTransaction = \
+        validatePayRequest()
     if len(errorMessage) > 0:
         return jsonify(message=errorMessage), errorCode
 
+    if signedTransaction is not None:
+        errorMessage, transactionHash = sendSignedOrderTransaction(
+            signedTransaction, orderForPayment, "customerPayOrder", ceil(orderForPayment.totalOrderPrice)
+        )
+        if len(errorMessage) > 0:
+            return jsonify(message=errorMessage), 400
+        confirmOrderPayment(orderForPayment, transactionHash)
+        return Response(status=200)
+
     try:
         # pokusaj dohvatanja adrese i desifrovanja privatnog kljuca
-        customerEthereumAddress = web3.to_checksum_address(ethereumKeys["address"])
-        customerEthereumPrivateKey = Account.decrypt(ethereumKeys, ethereumPassphrase).hex()
+        customerEthereumAddress = Web3.to_checksum_address(ethereumKeys["address"])
+        # dovhatanje deploy-ovanog pametnog ugovora sa blockchaina
+        ethereumContractDeployed = getOrderContract(orderForPayment.ethereumContractAddress)
+        # poziv koji bi ugovor odbio se odbija pre skupog desifrovanja kljuceva
+        errorMessage = preflightContractCall(ethereumContractDeployed.functions.customerPayOrder(orderForPayment.id), {
+            "from": customerEthereumAddress,
+            "value": ceil(orderForPayment.totalOrderPrice)
+        })
+        if len(errorMessage) > 0:
+            return jsonify(message=errorMessage), 400
+        customerEthereumPrivateKey = decryptPrivateKey(ethereumKeys, ethereumPassphrase)
         try:
-            # dovhatanje deploy-ovanog pametnog ugovora sa blockchaina
-            ethereumContractDeployed = web3.eth.contract(
-                address=orderForPayment.ethereumContractAddress,
-                abi=abi
-            )
             # radi vezbe cu koristiti build_transaction() metodu i eksplicitno potpisati transakciju, a jednostavniji
             # nacin bi bio koriscenje transact() metode jer se tu potpisivanje transakcije dogadja implicitno na osnovu
             # ethereum adrese naloga
-            transaction = ethereumContractDeployed.functions.customerPayOrder(orderForPayment.id).build_transaction({
+            # nonce i procena gasa se dohvataju jednim JSON-RPC zahtevom
+            customerPayOrder = ethereumContractDeployed.functions.customerPayOrder(orderForPayment.id)
+            transaction = buildContractTransaction(customerPayOrder, {
                 "from": customerEthereumAddress,  # receno u tekstu da kupac snosi troskove ovog transfera novca
                 "value": ceil(orderForPayment.totalOrderPrice),
-                "nonce": web3.eth.get_transaction_count(customerEthereumAddress),
                 "gasPrice": 21000
             })
-            signedTransaction = web3.eth.account.sign_transaction(transaction, customerEthereumPrivateKey)
-            transactionHash = web3.eth.send_raw_transaction(signedTransaction.rawTransaction)
-            web3.eth.wait_for_transaction_receipt(transactionHash)
+            signedTransaction = getWeb3().eth.account.sign_transaction(transaction, customerEthereumPrivateKey)
+            transactionHash = getWeb3().eth.send_raw_transaction(signedTransaction.rawTransaction)
+            confirmOrderPayment(orderForPayment, transactionHash)
         except ContractLogicError as contractLogicError:
             # placanje porudzbine nije uspelo
             contractLogicErrorString = str(contractLogicError)
@@ -96,13 +185,73 @@ def pay():
     except ValueError:
         # desifrovanje kljuceva nije uspelo
         return jsonify(message="Invalid credentials."), 400
+    except (KeystoreDecryptionBusy, BrokenProcessPool):
+        # proces za desifrovanje je ugasen (npr. zbog nedostatka memorije), pa se zahtev moze ponoviti kao i kada su
+        # svi procesi zauzeti
+        return jsonify(message="Too many concurrent requests."), 503
 
     return Response(status=200)
 
 
-def getSearchResult():
-    resultDictionary = {"categories": [], "products": []}
-    searchResults = database.session.query(
+def validateSearchRequest():
+    afterProductId = 0
+    cursor = request.args.get("cursor", None)
+    if cursor is not None:
+        afterProductId = decodeSearchCursor(cursor)
+        if afterProductId is None:
+            return "Invalid cursor.", 400, None, None
+
+    limit = request.args.get("limit", None)
+    if limit is not None:
+        # isdigit prihvata i znakove poput "²" koje int ne moze da pretvori u broj
+        try:
+            limit = int(limit)
+        except ValueError:
+            return "Invalid limit.", 400, None, None
+        if limit <= 0:
+            return "Invalid limit.", 400, None, None
+        limit = min(limit, Configuration.SEARCH_MAXIMUM_LIMIT)
+
+    return "", 0, afterProductId, limit
+
+
+def getSearchRows(afterProductId, limit):
+    productName = request.args.get("name", "")
+    categoryName = request.args.get("category", "")
+    # dzoker znakove iz LIKE izraza indeks ne podrzava, pa se takve pretrage i dalje izvrsavaju u bazi
+    if any(character in productName + categoryName for character in "%_\\"):
+        return getDatabaseSearchRows(productName, categoryName, afterProductId, limit)
+    return catalogIndexHolder.get(time.monotonic()).search(productName, categoryName, afterProductId, limit)
+
+
+def getDatabaseSearchRows(productName, categoryName, afterProductId, limit):
+    searchCondition = and_(
+        Product.productName.like(f"%{productName}%"),
+        Category.categoryName.like(f"%{categoryName}%"),
+        Product.id > afterProductId
+    )
+
+    hasMoreProducts = False
+    if limit is not None:
+        # limit se primenjuje na proizvode (ne na redove proizvod-kategorija), pa se najpre dohvata stranica id-eva
+        # proizvoda, a zatim samo njihove kategorije; jedan proizvod vise govori da postoji sledeca stranica
+        productIds = [productId for productId, in database.session.query(
+            Product.id
+        ).join(
+            ProductCategory, Product.id == ProductCategory.productId
+        ).join(
+            Category, ProductCategory.categoryId == Category.id
+        ).filter(
+            searchCondition
+        ).group_by(
+            Product.id
+        ).order_by(
+            asc(Product.id)
+        ).limit(limit + 1).all()]
+        hasMoreProducts = len(productIds) > limit
+        searchCondition = and_(searchCondition, Product.id.in_(productIds[:limit]))
+
+    searchRows = database.session.query(
         Product.id.label("ProductId"),
         Product.productName.label("ProductName"),
         Product.productPrice.label("ProductPrice"),
@@ -112,29 +261,11 @@ def getSearchResult():
     ).join(
         Category, ProductCategory.categoryId == Category.id
     ).filter(
-        and_(
-            Product.productName.like(f"%{request.args.get('name', '')}%"),
-            Category.categoryName.like(f"%{request.args.get('category', '')}%")
-        )
+        searchCondition
+    ).order_by(
+        asc(Product.id), asc(ProductCategory.id)
     ).all()
-
-    for searchResult in searchResults:
-        if searchResult.CategoryName not in resultDictionary["categories"]:
-            resultDictionary["categories"].append(searchResult.CategoryName)
-        productAlreadyAdded = False
-        for product in resultDictionary["products"]:
-            if product["id"] == searchResult.ProductId:
-                productAlreadyAdded = True
-                product["categories"].append(searchResult.CategoryName)
-                break
-        if not productAlreadyAdded:
-            resultDictionary["products"].append({
-                "categories": [searchResult.CategoryName],
-                "id": searchResult.ProductId,
-                "name": searchResult.ProductName,
-                "price": searchResult.ProductPrice
-            })
-    return resultDictionary
+    return searchRows, hasMoreProducts
 
 
 def validateOrderRequest():
@@ -161,7 +292,7 @@ def validateOrderRequest():
     if customerEthereumAddress == "null" or customerEthereumAddress == "":
         return None, "Field address is missing.", 400, None
 
-    if not web3.is_address(customerEthereumAddress):
+    if not Web3.is_address(customerEthereumAddress):
         return None, "Invalid address.", 400, None
 
     return requests, "", 0, customerEthereumAddress
@@ -183,44 +314,56 @@ def getNewOrderData(requests, customerEthereumAddress):
         totalOrderPrice += currentRequest["quantity"] * orderedProductPrice.ProductPrice
     orderCreationTime = datetime.now(timezone.utc).isoformat()
 
-    # vlasnik prodavnice kreira transakciju u kojoj dodaje ethereum pametni ugovor u blockchain
-    transactionHashCode = ethereumContract.constructor(
-        customerEthereumAddress, ceil(totalOrderPrice)
-        # receno u tekstu da ugovor treba vezati za kupca koji je kreirao narudzbinu
-    ).transact({
-        "from": ownerEthereumAddress  # receno u tekstu da vlasnik prodavnice snosi troskove kreiranja ugovora
-    })
-    # poziv transact metode automatski u pozadini potpisuje transakciju koristeci prosledjeni ethereum nalog tako sto
-    # na osnovu naloga zna njegov privatni kljuc pomocu kog se potpise transakcija
-
-    # transakcije se grupisu u blokove koji se uvezuju u blockchain (blockchain je kao ulancana lista koja se sastoji
-    # od tih blokova, gde je u svakom bloku zapamcen odredjen broj transakcija)
+    if Configuration.ASYNCHRONOUS_CONTRACT_DEPLOYMENT:
+        # ugovor u pozadini postavlja contractDeployer servis, a narudzbina do tada ima status DEPLOYING i praznu
+        # adresu ugovora, pa zahtev ne ceka da transakcija bude mine-ovana
+        return totalOrderPrice, "DEPLOYING", orderCreationTime, get_jwt_identity()
 
-    # miner-i su ljudi koji se takmice u resavanju kompleksnih matematickih problema, i onaj ko pobedi dobija pravo
-    # da doda novi blok sa odredjenim brojem transakcija u blockchain i dobija nagradu tako sto ce mu na racun biti
-    # prebacen odredjen broj kriptovaluta - pre nego sto taj novi blok zaista bude dodat u blockchain, on mora biti
-    # verifikovan i od strane ostalih cvorova u mrezi (u tome se upravo ogleda decentralizovana bezbednost blockchain-a)
-
-    # cekamo da nasa transakcija bude mine-ovana, tj. da bude potvrdjeno da je ona verifikovana i dodata u blockchain
-    transactionReceipt = web3.eth.wait_for_transaction_receipt(transactionHashCode)
-    # dohvatamo ethereum adresu naseg pametnog ugovora koji je sada u blockchain-u
-    contractEthereumAddress = transactionReceipt.contractAddress
-
-    return totalOrderPrice, "CREATED", orderCreationTime, get_jwt_identity(), contractEthereumAddress
+    return totalOrderPrice, "CREATED", orderCreationTime, get_jwt_identity()
 
 
 def insertOrder(requests, customerEthereumAddress):
-    totalOrderPrice, orderStatus, orderCreationTime, buyerEmail, ethereumContractAddress = \
-        getNewOrderData(requests, customerEthereumAddress)
+    totalOrderPrice, orderStatus, orderCreationTime, buyerEmail = getNewOrderData(requests, customerEthereumAddress)
+    # narudzbina se upisuje i potvrdjuje pre postavljanja ugovora (kao DEPLOYING, dok ugovor ne postoji), kako
+    # transakcija baze ne bi drzala zakljucane redove dok se ceka blockchain
     newOrder = Order(
         totalOrderPrice=totalOrderPrice,
-        orderStatus=orderStatus,
+        orderStatus="DEPLOYING",
         orderCreationTime=orderCreationTime,
+        orderUpdateTime=datetime.utcnow(),
         buyerEmail=buyerEmail,
-        ethereumContractAddress=ethereumContractAddress
+        customerEthereumAddress=customerEthereumAddress,
+        ethereumContractAddress=""
     )
     database.session.add(newOrder)
     database.session.commit()
+
+    if orderStatus == "CREATED":
+        transactionHashCode = createOrderContract(customerEthereumAddress, ceil(totalOrderPrice))
+        # hes se upisuje odmah, pa ako zahtev bude prekinut dok ceka potvrdu, contractDeployer zavrsava narudzbinu
+        newOrder.ethereumTransactionHash = transactionHashCode.hex()
+        newOrder.ethereumTransactionTime = datetime.utcnow()
+        database.session.commit()
+
+        # transakcije se grupisu u blokove koji se uvezuju u blockchain (blockchain je kao ulancana lista koja se
+        # sastoji od tih blokova, gde je u svakom bloku zapamcen odredjen broj transakcija)
+
+        # miner-i su ljudi koji se takmice u resavanju kompleksnih matematickih problema, i onaj ko pobedi dobija pravo
+        # da doda novi blok sa odredjenim brojem transakcija u blockchain i dobija nagradu tako sto ce mu na racun biti
+        # prebacen odredjen broj kriptovaluta - pre nego sto taj novi blok zaista bude dodat u blockchain, on mora biti
+        # verifikovan i od strane ostalih cvorova u mrezi (u tome se upravo ogleda decentralizovana bezbednost
+        # blockchain-a)
+
+        # cekamo da nasa transakcija bude mine-ovana, tj. da bude potvrdjeno da je ona verifikovana i dodata u
+        # blockchain
+        transactionReceipt = waitForTransactionReceipt(transactionHashCode)
+        # dohvatamo ethereum adresu naseg pametnog ugovora koji je sada u blockchain-u
+        updateOrder(
+            newOrder.id, Order.__table__.c.orderStatus == "DEPLOYING",
+            orderStatus="CREATED", ethereumContractAddress=getOrderContractAddress(transactionReceipt)
+        )
+        database.session.commit()
+
     return newOrder
 
 
@@ -235,73 +378,52 @@ def insertProductOrder(requests, newOrder):
             )
         )
     database.session.bulk_save_objects(newProductOrders)
+    # redovi statistike se zakljucavaju pre brojaca, kao i pri isporuci
+    statisticsChanged = addOrderedQuantities(requests)
+    bumpDataVersion(getBuyerDataVersionName(newOrder.buyerEmail))
+    if statisticsChanged:
+        bumpDataVersion(STORE_DATA_VERSION)
     database.session.commit()
     return {"id": newOrder.id}
 
 
-def getOrderStatuses():
-    orders = database.session.query(
-        Order.id.label("OrderId"),
-        Order.totalOrderPrice.label("TotalOrderPrice"),
-        Order.orderStatus.label("OrderStatus"),
-        Order.orderCreationTime.label("OrderCreationTime"),
-        Product.id.label("ProductId"),
-        Product.productName.label("ProductName"),
-        Product.productPrice.label("ProductPrice"),
-        ProductOrder.quantity.label("Quantity"),
-        Category.categoryName.label("CategoryName")
-    ).join(
-        ProductOrder, Order.id == ProductOrder.orderId
-    ).join(
-        Product, ProductOrder.productId == Product.id
-    ).join(
-        ProductCategory, Product.id == ProductCategory.productId
-    ).join(
-        Category, ProductCategory.categoryId == Category.id
-    ).filter(
-        Order.buyerEmail == get_jwt_identity()
-    ).order_by(
-        asc("OrderId"), asc("ProductId"), asc("CategoryName")
-    ).all()
+def validateStatusRequest():
+    # status moze biti i lista statusa razdvojenih zarezima, a since je vreme u ISO 8601 obliku od kog se vracaju
+    # narudzbine koje su kreirane ili izmenjene
+    orderStatuses = request.args.get("status", None)
+    if orderStatuses is not None:
+        orderStatuses = orderStatuses.split(",")
+        if any(orderStatus not in ORDER_STATUSES for orderStatus in orderStatuses):
+            return "Invalid status.", 400, None, None, None, None, None
+
+    sinceTime = request.args.get("since", None)
+    if sinceTime is not None:
+        sinceTime = parseOrderTime(sinceTime)
+        if sinceTime is None:
+            return "Invalid since.", 400, None, None, None, None, None
+
+    afterOrderId = 0
+    cursor = request.args.get("cursor", None)
+    if cursor is not None:
+        afterOrderId = decodeOrderCursor(cursor)
+        if afterOrderId is None:
+            return "Invalid cursor.", 400, None, None, None, None, None
+
+    limit = request.args.get("limit", None)
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            return "Invalid limit.", 400, None, None, None, None, None
+        if limit <= 0:
+            return "Invalid limit.", 400, None, None, None, None, None
+        limit = min(limit, Configuration.STATUS_MAXIMUM_LIMIT)
 
-    response = {"orders": []}
-    previousOrderId = previousProductId = -1
-    currentOrderIndex = currentProductIndex = -1
-    for currentOrder in orders:
-        currentOrderId = currentOrder.OrderId
-        currentProductId = currentOrder.ProductId
-        if currentOrderId != previousOrderId:
-            currentOrderIndex += 1
-            currentProductIndex = 0
-            response["orders"].append({
-                "products": [
-                    {
-                        "categories": [currentOrder.CategoryName],
-                        "name": currentOrder.ProductName,
-                        "price": currentOrder.ProductPrice,
-                        "quantity": currentOrder.Quantity
-                    }
-                ],
-                "price": currentOrder.TotalOrderPrice,
-                "status": currentOrder.OrderStatus,
-                "timestamp": currentOrder.OrderCreationTime
-            })
-        else:
-            if currentProductId != previousProductId:
-                response["orders"][currentOrderIndex]["products"].append({
-                    "categories": [currentOrder.CategoryName],
-                    "name": currentOrder.ProductName,
-                    "price": currentOrder.ProductPrice,
-                    "quantity": currentOrder.Quantity
-                })
-                currentProductIndex += 1
-            else:
-                response["orders"][currentOrderIndex]["products"][currentProductIndex]["categories"].append(
-                    currentOrder.CategoryName
-                )
-        previousOrderId = currentOrderId
-        previousProductId = currentProductId
-    return response
+    summary = request.args.get("summary", "false")
+    if summary not in ["true", "false"]:
+        return "Invalid summary.", 400, None, None, None, None, None
+
+    return "", 0, orderStatuses, sinceTime, afterOrderId, limit, summary == "true"
 
 
 def validateDeliveredRequest():
@@ -315,6 +437,18 @@ def validateDeliveredRequest():
         return "Invalid order id.", 400, None
     if orderForDeliveryConfirmation.orderStatus != "PENDING":
         return "Invalid order id.", 400, None
+
+    signedTransaction = request.json.get("transaction", None)
+    if signedTransaction is not None and signedTransaction != "":
+        errorMessage, transactionHash = sendSignedOrderTransaction(
+            signedTransaction, orderForDeliveryConfirmation, "customerConfirmDelivery", 0
+        )
+        if len(errorMessage) > 0:
+            return errorMessage, 400, None
+        if not Configuration.ORDER_STATUS_FROM_EVENTS:
+            waitForTransactionReceipt(transactionHash)
+        return "", 0, orderForDeliveryConfirmation
+
     ethereumKeys = request.json.get("keys", None)
     if ethereumKeys is None or ethereumKeys == "":
         return "Missing keys.", 400, None
@@ -326,25 +460,30 @@ def validateDeliveredRequest():
 
     try:
         # pokusaj dohvatanja adrese i desifrovanja privatnog kljuca
-        customerEthereumAddress = web3.to_checksum_address(ethereumKeys["address"])
-        customerEthereumPrivateKey = Account.decrypt(ethereumKeys, ethereumPassphrase).hex()
+        customerEthereumAddress = Web3.to_checksum_address(ethereumKeys["address"])
+        # dovhatanje deploy-ovanog pametnog ugovora sa blockchaina
+        ethereumContractDeployed = getOrderContract(orderForDeliveryConfirmation.ethereumContractAddress)
+        # poziv koji bi ugovor odbio se odbija pre skupog desifrovanja kljuceva
+        errorMessage = preflightContractCall(ethereumContractDeployed.functions.customerConfirmDelivery(orderId), {
+            "from": customerEthereumAddress
+        })
+        if len(errorMessage) > 0:
+            return errorMessage, 400, None
+        customerEthereumPrivateKey = decryptPrivateKey(ethereumKeys, ethereumPassphrase)
         try:
-            # dovhatanje deploy-ovanog pametnog ugovora sa blockchaina
-            ethereumContractDeployed = web3.eth.contract(
-                address=orderForDeliveryConfirmation.ethereumContractAddress,
-                abi=abi
-            )
             # radi vezbe cu koristiti build_transaction() metodu i eksplicitno potpisati transakciju, a jednostavniji
             # nacin bi bio koriscenje transact() metode jer se tu potpisivanje transakcije dogadja implicitno na osnovu
             # ethereum adrese naloga
-            transaction = ethereumContractDeployed.functions.customerConfirmDelivery(orderId).build_transaction({
+            # nonce i procena gasa se dohvataju jednim JSON-RPC zahtevom
+            customerConfirmDelivery = ethereumContractDeployed.functions.customerConfirmDelivery(orderId)
+            transaction = buildContractTransaction(customerConfirmDelivery, {
                 "from": customerEthereumAddress,  # receno u tekstu da kupac snosi troskove ovog transfera novca
-                "nonce": web3.eth.get_transaction_count(customerEthereumAddress),
                 "gasPrice": 21000
             })
-            signedTransaction = web3.eth.account.sign_transaction(transaction, customerEthereumPrivateKey)
-            transactionHash = web3.eth.send_raw_transaction(signedTransaction.rawTransaction)
-            web3.eth.wait_for_transaction_receipt(transactionHash)
+            signedTransaction = getWeb3().eth.account.sign_transaction(transaction, customerEthereumPrivateKey)
+            transactionHash = getWeb3().eth.send_raw_transaction(signedTransaction.rawTransaction)
+            if not Configuration.ORDER_STATUS_FROM_EVENTS:
+                waitForTransactionReceipt(transactionHash)
         except ContractLogicError as contractLogicError:
             # transfer novca vlasniku i kuriru nije uspeo
             contractLogicErrorString = str(contractLogicError)
@@ -352,36 +491,54 @@ def validateDeliveredRequest():
     except ValueError:
         # desifrovanje kljuceva nije uspelo
         return "Invalid credentials.", 400, None
+    except (KeystoreDecryptionBusy, BrokenProcessPool):
+        return "Too many concurrent requests.", 503, None
 
     return "", 0, orderForDeliveryConfirmation
 
 
+def confirmOrderPayment(orderForPayment, transactionHash):
+    # inace uplatu belezi indekser dogadjaja kada transakcija bude mine-ovana
+    if not Configuration.ORDER_STATUS_FROM_EVENTS:
+        waitForTransactionReceipt(transactionHash)
+        markOrderPaid(orderForPayment.id)
+        database.session.commit()
+
+
 def confirmOrderDelivery(orderForDeliveryConfirmation):
-    orderForDeliveryConfirmation.orderStatus = "COMPLETE"
+    markOrderDelivered(orderForDeliveryConfirmation.id)
     database.session.commit()
 
 
 def validatePayRequest():
     orderId = request.json.get("id", None)
     if orderId is None:
-        return "Missing order id.", 400, None, None, None
+        return "Missing order id.", 400, None, None, None, None
     if type(orderId) is not int or orderId <= 0:
-        return "Invalid order id.", 400, None, None, None
+        return "Invalid order id.", 400, None, None, None, None
     orderForPayment = Order.query.filter(Order.id == orderId).first()
     if not orderForPayment:
-        return "Invalid order id.", 400, None, None, None
+        return "Invalid order id.", 400, None, None, None, None
     if orderForPayment.orderStatus != "CREATED":
-        return "Invalid order id.", 400, None, None, None
+        return "Invalid order id.", 400, None, None, None, None
+
+    signedTransaction = request.json.get("transaction", None)
+    if signedTransaction is not None and signedTransaction != "":
+        # kupac je sam potpisao transakciju, pa kljucevi i lozinka nisu potrebni
+        return "", 0, orderForPayment, None, None, signedTransaction
+
     ethereumKeys = request.json.get("keys", None)
     if ethereumKeys is None or ethereumKeys == "":
-        return "Missing keys.", 400, None, None, None
+        return "Missing keys.", 400, None, None, None, None
     ethereumPassphrase = request.json.get("passphrase", None)
     if ethereumPassphrase is None or ethereumPassphrase == "":
-        return "Missing passphrase.", 400, None, None, None
+        return "Missing passphrase.", 400, None, None, None, None
     ethereumKeys = json.loads(ethereumKeys.replace("'", '"').replace('\n', '').replace(' ', ''))
-    return "", 0, orderForPayment, ethereumKeys, ethereumPassphrase
+    return "", 0, orderForPayment, ethereumKeys, ethereumPassphrase, None
 
 
 if __name__ == "__main__":
     database.init_app(application)
+    with application.app_context():
+        catalogIndexHolder.get(time.monotonic())
     application.run(debug=True, host=Configuration.HOST, port=Configuration.CUSTOMER_APPLICATION_PORT)
@@ -0,0 +1,37 @@
+from models import database, DataVersion
+from sqlalchemy.dialects.mysql import insert
+
+# brojac koji se uvecava u svakoj transakciji koja menja podatke od kojih zavisi statistika (nove stavke narudzbina,
+# isporuke i izmene kataloga), na osnovu njega servis za statistiku zna da li su kesirani rezultati vazeci; statistika
+# razlikuje samo isporucene i neisporucene narudzbine, pa postavljanje ugovora i preuzimanje ne menjaju ovaj brojac,
+# kako transakcije koje ne menjaju statistiku ne bi cekale na zakljucan red brojaca
+STORE_DATA_VERSION = "store"
+# brojac koji vlasnik uvecava pri svakoj izmeni kataloga, na osnovu njega kupac zna kada da ponovo izgradi indeks
+# kataloga za pretragu
+CATALOG_DATA_VERSION = "catalog"
+
+
+def getBuyerDataVersionName(buyerEmail):
+    # brojac koji se uvecava u svakoj transakciji koja menja narudzbine kupca, na osnovu njega se zna da li je
+    # sacuvan odgovor na /status vazeci
+    return f"buyer:{buyerEmail}"
+
+
+def getDataVersion(name):
+    dataVersion = DataVersion.query.filter(DataVersion.name == name).first()
+    return 0 if dataVersion is None else dataVersion.value
+
+
+def bumpDataVersion(name):
+    # red ostaje zakljucan do commit-a, pa ovu funkciju treba pozvati neposredno pre commit-a transakcije
+    insertStatement = insert(DataVersion.__table__).values(name=name, value=1)
+    database.session.execute(insertStatement.on_duplicate_key_update(
+        value=DataVersion.__table__.c.value + 1
+    ))
+
+
+def bumpDataVersions(names):
+    # brojaci se uvecavaju u rastucem redosledu imena (npr. brojaci kupaca pre STORE_DATA_VERSION), pa istovremene
+    # transakcije zakljucavaju redove istim redosledom i ne mogu se medjusobno blokirati
+    for name in sorted(set(names)):
+        bumpDataVersion(name)
@@ -0,0 +1,100 @@
+from flask import Flask
+from configuration import Configuration, getWeb3
+from web3 import Web3
+from models import database, Order, BlockCheckpoint
+from orderTransitions import markOrderPaid, markOrderPickedUp, markOrderDelivered
+from dataVersions import bumpDataVersions
+import sys
+import time
+
+# pozadinski servis koji prati dogadjaje Order ugovora i na osnovu njih menja narudzbine u bazi; poslednji obradjeni
+# blok se upisuje u istoj transakciji kao i izmene narudzbina, a kako su prelazi idempotentni, ponovna obrada grupe
+# blokova posle restarta nema efekta
+# servis treba pokretati u jednoj instanci
+
+EVENT_INDEXER_CHECKPOINT_NAME = "orderEvents"
+
+application = Flask(__name__)
+application.config.from_object(Configuration)
+
+orderEvents = {
+    "CustomerPaidForTheOrder": markOrderPaid,
+    "CourierPickedUpTheOrder": markOrderPickedUp,
+    "CustomerConfirmedOrderDelivery": markOrderDelivered
+}
+orderEventTopics = {
+    Web3.keccak(text=f"{eventName}(uint256)").hex(): eventName for eventName in orderEvents.keys()
+}
+
+
+def getCheckpointBlockNumber():
+    blockCheckpoint = BlockCheckpoint.query.filter(BlockCheckpoint.name == EVENT_INDEXER_CHECKPOINT_NAME).first()
+    return -1 if blockCheckpoint is None else blockCheckpoint.blockNumber
+
+
+def setCheckpointBlockNumber(blockNumber):
+    blockCheckpoint = BlockCheckpoint.query.filter(BlockCheckpoint.name == EVENT_INDEXER_CHECKPOINT_NAME).first()
+    if blockCheckpoint is None:
+        database.session.add(BlockCheckpoint(name=EVENT_INDEXER_CHECKPOINT_NAME, blockNumber=blockNumber))
+    else:
+        blockCheckpoint.blockNumber = blockNumber
+
+
+def findOrderForLog(log):
+    # dogadjaj se prihvata samo ako ga je emitovao bas ugovor narudzbine, jer bilo ko moze postaviti ugovor sa istim
+    # dogadjajima; orderId iz dogadjaja prosledjuje pozivalac, pa se narudzbina odredjuje samo po adresi ugovora
+    return Order.query.filter(Order.ethereumContractAddress == log["address"]).first()
+
+
+def applyLog(log, dataVersionNames):
+    eventName = orderEventTopics[log["topics"][0].hex()]
+    order = findOrderForLog(log)
+    if order is None:
+        return False
+    return orderEvents[eventName](order.id, dataVersionNames)
+
+
+def indexBlocks(fromBlock, toBlock):
+    logs = getWeb3().eth.get_logs({
+        "fromBlock": fromBlock,
+        "toBlock": toBlock,
+        "topics": [list(orderEventTopics.keys())]
+    })
+    # dogadjaji se primenjuju redosledom kojim su emitovani, kako bi preuzimanje bilo obradjeno pre isporuke
+    # brojaci izmenjenih podataka se uvecavaju tek na kraju, svi zajedno, kako bi redovi brojaca bili zakljucani
+    # istim redosledom kao u zahtevima
+    appliedLogs = 0
+    dataVersionNames = set()
+    for log in sorted(logs, key=lambda currentLog: (currentLog["blockNumber"], currentLog["logIndex"])):
+        if applyLog(log, dataVersionNames):
+            appliedLogs += 1
+    setCheckpointBlockNumber(toBlock)
+    bumpDataVersions(dataVersionNames)
+    database.session.commit()
+    return appliedLogs
+
+
+def indexNewBlocks():
+    lastBlockNumber = getWeb3().eth.block_number - Configuration.EVENT_INDEXER_CONFIRMATIONS
+    fromBlock = getCheckpointBlockNumber() + 1
+    while fromBlock <= lastBlockNumber:
+        toBlock = min(fromBlock + Configuration.EVENT_INDEXER_BATCH_SIZE - 1, lastBlockNumber)
+        indexBlocks(fromBlock, toBlock)
+        fromBlock = toBlock + 1
+
+
+def runEventIndexer():
+    while True:
+        try:
+            indexNewBlocks()
+        except Exception as exception:
+            database.session.rollback()
+            print(f"Event indexing failed: {exception}", file=sys.stderr)
+        database.session.remove()
+        time.sleep(Configuration.EVENT_INDEXER_POLL_INTERVAL)
+
+
+if __name__ == "__main__":
+    database.init_app(application)
+    with application.app_context():
+        runEventIndexer()
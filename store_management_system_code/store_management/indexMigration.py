@@ -0,0 +1,158 @@
+from flask import Flask
+from configuration import Configuration
+from models import database
+from sqlalchemy import inspect, literal
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy_utils import database_exists, create_database
+import sys
+
+# migrate.py pravi semu nove baze, ali u vec postojecoj bazi (postojeci volumen sa ranijom verzijom sheme) ne mora da
+# uspe; ova skripta zato sama dovodi postojecu bazu do models.py: pravi tabele koje nedostaju, dodaje kolone koje
+# nedostaju (kolona koja ne sme biti NULL dobija podrazumevanu vrednost iz models.py), prosiruje tekstualne kolone koje
+# su u models.py duze (npr. dataversions.name) i dodaje indekse koji nedostaju; tabele, kolone i indeksi se porede po
+# imenu, a duzine kolona po duzini, pa se skripta moze pokretati vise puta
+# pokrece se posle migrate.py (i kada migrate.py ne uspe) u kontejneru storeDatabaseMigration, a moze i rucno:
+# python indexMigration.py
+
+
+def createMissingTables(engine):
+    existingTableNames = set(inspect(engine).get_table_names())
+    missingTables = [table for table in database.Model.metadata.sorted_tables if table.name not in existingTableNames]
+    # nove tabele se prave zajedno sa svojim indeksima
+    database.Model.metadata.create_all(bind=engine, tables=missingTables)
+    return [table.name for table in missingTables]
+
+
+def getMissingColumns(engine):
+    inspector = inspect(engine)
+    existingTableNames = set(inspector.get_table_names())
+    missingColumns = []
+    for table in database.Model.metadata.sorted_tables:
+        if table.name not in existingTableNames:
+            continue
+        existingColumnNames = {column["name"] for column in inspector.get_columns(table.name)}
+        missingColumns.extend(column for column in table.columns if column.name not in existingColumnNames)
+    return missingColumns
+
+
+def getColumnDefinition(column, dialect):
+    # postojeci redovi dobijaju podrazumevanu vrednost kolone; kolona bez nje mora da dozvoli NULL
+    columnDefinition = column.type.compile(dialect=dialect)
+    if column.default is None or not column.default.is_scalar:
+        return columnDefinition
+    defaultValue = literal(column.default.arg, column.type).compile(
+        dialect=dialect, compile_kwargs={"literal_binds": True}
+    )
+    return f"{columnDefinition}{'' if column.nullable else ' NOT NULL'} DEFAULT {defaultValue}"
+
+
+def addMissingColumns(engine):
+    addedColumnNames = []
+    failedColumnNames = []
+    preparer = engine.dialect.identifier_preparer
+    for column in getMissingColumns(engine):
+        columnName = f"{column.table.name}.{column.name}"
+        try:
+            engine.execute(
+                f"ALTER TABLE {preparer.quote(column.table.name)} ADD COLUMN {preparer.quote(column.name)} "
+                f"{getColumnDefinition(column, engine.dialect)}"
+            )
+            addedColumnNames.append(columnName)
+        except SQLAlchemyError as exception:
+            print(f"Adding column {columnName} failed: {exception}", file=sys.stderr)
+            failedColumnNames.append(columnName)
+    return addedColumnNames, failedColumnNames
+
+
+def getNarrowColumns(engine):
+    inspector = inspect(engine)
+    existingTableNames = set(inspector.get_table_names())
+    narrowColumns = []
+    for table in database.Model.metadata.sorted_tables:
+        if table.name not in existingTableNames:
+            continue
+        existingColumns = {column["name"]: column for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existingColumns:
+                continue
+            length = getattr(column.type, "length", None)
+            existingLength = getattr(existingColumns[column.name]["type"], "length", None)
+            if length is not None and existingLength is not None and existingLength < length:
+                narrowColumns.append(column)
+    return narrowColumns
+
+
+def widenColumns(engine):
+    # sqlite ne ogranicava duzinu tekstualnih kolona, pa se kolone menjaju samo u MySQL
+    widenedColumnNames = []
+    failedColumnNames = []
+    if engine.dialect.name != "mysql":
+        return widenedColumnNames, failedColumnNames
+    preparer = engine.dialect.identifier_preparer
+    for column in getNarrowColumns(engine):
+        columnName = f"{column.table.name}.{column.name}"
+        try:
+            engine.execute(
+                f"ALTER TABLE {preparer.quote(column.table.name)} MODIFY {preparer.quote(column.name)} "
+                f"{column.type.compile(dialect=engine.dialect)}{'' if column.nullable else ' NOT NULL'}"
+            )
+            widenedColumnNames.append(columnName)
+        except SQLAlchemyError as exception:
+            print(f"Widening column {columnName} failed: {exception}", file=sys.stderr)
+            failedColumnNames.append(columnName)
+    return widenedColumnNames, failedColumnNames
+
+
+def getMissingIndexes(engine):
+    inspector = inspect(engine)
+    existingTableNames = set(inspector.get_table_names())
+    missingIndexes = []
+    for table in database.Model.metadata.sorted_tables:
+        if table.name not in existingTableNames:
+            continue
+        existingIndexNames = {index["name"] for index in inspector.get_indexes(table.name)}
+        missingIndexes.extend(
+            index for index in sorted(table.indexes, key=lambda currentIndex: currentIndex.name)
+            if index.name not in existingIndexNames
+        )
+    return missingIndexes
+
+
+def createMissingIndexes(engine):
+    # jedinstveni indeks se ne moze napraviti ako tabela vec sadrzi duplikate, pa se neuspeh prijavljuje, a ostali
+    # indeksi se i dalje prave
+    createdIndexNames = []
+    failedIndexNames = []
+    for index in getMissingIndexes(engine):
+        try:
+            index.create(bind=engine)
+            createdIndexNames.append(index.name)
+        except SQLAlchemyError as exception:
+            print(f"Creating index {index.name} failed: {exception}", file=sys.stderr)
+            failedIndexNames.append(index.name)
+    return createdIndexNames, failedIndexNames
+
+
+if __name__ == "__main__":
+    if not database_exists(Configuration.SQLALCHEMY_DATABASE_URI):
+        create_database(Configuration.SQLALCHEMY_DATABASE_URI)
+
+    application = Flask(__name__)
+    application.config.from_object(Configuration)
+    database.init_app(application)
+    with application.app_context():
+        createdTableNames = createMissingTables(database.engine)
+        addedColumnNames, failedAddedColumnNames = addMissingColumns(database.engine)
+        widenedColumnNames, failedColumnNames = widenColumns(database.engine)
+        createdIndexNames, failedIndexNames = createMissingIndexes(database.engine)
+    for createdTableName in createdTableNames:
+        print(f"Created table {createdTableName}.")
+    for addedColumnName in addedColumnNames:
+        print(f"Added column {addedColumnName}.")
+    for widenedColumnName in widenedColumnNames:
+        print(f"Widened column {widenedColumnName}.")
+    for createdIndexName in createdIndexNames:
+        print(f"Created index {createdIndexName}.")
+    if len(createdIndexNames) == 0 and len(failedIndexNames) == 0:
+        print("All indexes already exist.")
+    sys.exit(1 if len(failedAddedColumnNames) > 0 or len(failedColumnNames) > 0 or len(failedIndexNames) > 0 else 0)
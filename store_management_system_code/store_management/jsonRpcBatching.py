@@ -0,0 +1,125 @@
+from eth_utils import to_bytes
+from web3 import HTTPProvider
+from web3._utils.encoding import FriendlyJsonSerde
+from web3._utils.request import make_post_request
+from web3.exceptions import ContractLogicError
+import threading
+
+
+class BatchingHTTPProvider(HTTPProvider):
+    # HTTP provider koji vise medjusobno nezavisnih JSON-RPC poziva salje kao jedan JSON niz u jednom HTTP zahtevu i
+    # pamti odgovore koji se ne menjaju (id lanca i kod vec postavljenog ugovora)
+    def __init__(self, endpoint_uri, **kwargs):
+        super().__init__(endpoint_uri, **kwargs)
+        self.lock = threading.Lock()
+        self.cachedResults = dict()
+        self.httpRequests = 0
+
+    def getCacheKey(self, method, params):
+        if method == "eth_chainId":
+            return method,
+        if method == "eth_getCode":
+            return method, str(params[0]).lower()
+        return None
+
+    def getCachedResult(self, cacheKey):
+        if cacheKey is None:
+            return None
+        with self.lock:
+            return self.cachedResults.get(cacheKey, None)
+
+    def cacheResponse(self, cacheKey, response):
+        # prazan kod znaci da ugovor na toj adresi (jos) ne postoji, pa se ne pamti
+        if cacheKey is None or "result" not in response or response["result"] in (None, "0x"):
+            return
+        with self.lock:
+            self.cachedResults[cacheKey] = response["result"]
+
+    def countHttpRequest(self):
+        with self.lock:
+            self.httpRequests += 1
+
+    def make_request(self, method, params):
+        cacheKey = self.getCacheKey(method, params)
+        cachedResult = self.getCachedResult(cacheKey)
+        if cachedResult is not None:
+            return {"jsonrpc": "2.0", "id": next(self.request_counter), "result": cachedResult}
+
+        self.countHttpRequest()
+        response = super().make_request(method, params)
+        self.cacheResponse(cacheKey, response)
+        return response
+
+    def makeBatchRequest(self, requests):
+        # requests je lista parova (metoda, parametri), a vraca se lista JSON-RPC odgovora istim redosledom
+        responses = [None] * len(requests)
+        rpcRequests = []
+        for index, (method, params) in enumerate(requests):
+            cachedResult = self.getCachedResult(self.getCacheKey(method, params))
+            if cachedResult is not None:
+                responses[index] = {"jsonrpc": "2.0", "id": None, "result": cachedResult}
+                continue
+            rpcRequests.append((index, next(self.request_counter), method, params))
+
+        if len(rpcRequests) > 0:
+            requestData = b"[" + b",".join(
+                self.encodeRpcRequest(method, params, requestId)
+                for _, requestId, method, params in rpcRequests
+            ) + b"]"
+            self.countHttpRequest()
+            rawResponse = make_post_request(self.endpoint_uri, requestData, **self.get_request_kwargs())
+            # cvor ne mora da vrati odgovore redosledom zahteva, pa se uparuju po id-u
+            responsesById = {response["id"]: response for response in self.decode_rpc_response(rawResponse)}
+            for index, requestId, method, params in rpcRequests:
+                responses[index] = responsesById[requestId]
+                self.cacheResponse(self.getCacheKey(method, params), responses[index])
+        return responses
+
+    def encodeRpcRequest(self, method, params, requestId):
+        return to_bytes(text=FriendlyJsonSerde().json_encode({
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params or [],
+            "id": requestId
+        }))
+
+
+def raiseOnRpcError(response):
+    if "error" not in response:
+        return
+    raise ValueError(response["error"])
+
+
+def isRevertError(response):
+    # samo odbijanje izvrsavanja je greska ugovora; ostale greske cvora (npr. nedovoljno sredstava za gas) ostaju
+    # ValueError kao i kod build_transaction
+    if "error" not in response:
+        return False
+    revertData = response["error"].get("data", None)
+    return "revert" in response["error"].get("message", "") or (isinstance(revertData, str) and revertData[:2] == "0x")
+
+
+def buildContractTransaction(contractFunction, transaction):
+    # kao build_transaction, ali se nonce, procena gasa i id lanca (koji je najcesce vec zapamcen) dohvataju jednim
+    # HTTP zahtevom umesto uzastopnim pozivima; privremene vrednosti samo sprecavaju build_transaction da ih sam dohvati
+    transaction = contractFunction.build_transaction(dict(transaction, gas=0, nonce=0, chainId=0))
+    nonceResponse, gasResponse, chainIdResponse = contractFunction.w3.provider.makeBatchRequest([
+        ("eth_getTransactionCount", [transaction["from"], "pending"]),
+        ("eth_estimateGas", [{
+            "from": transaction["from"],
+            "to": transaction["to"],
+            "data": transaction["data"],
+            "value": hex(transaction.get("value", 0))
+        }]),
+        ("eth_chainId", [])
+    ])
+    if isRevertError(gasResponse):
+        # ugovor bi odbio transakciju, poruka sadrzi razlog odbijanja kao i kod build_transaction
+        raise ContractLogicError(gasResponse["error"]["message"])
+    raiseOnRpcError(gasResponse)
+    raiseOnRpcError(nonceResponse)
+    raiseOnRpcError(chainIdResponse)
+    transaction["nonce"] = int(nonceResponse["result"], 16)
+    transaction["gas"] = int(gasResponse["result"], 16)
+    transaction["chainId"] = int(chainIdResponse["result"], 16)
+    return transaction
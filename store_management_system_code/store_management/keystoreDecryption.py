@@ -0,0 +1,95 @@
+from configuration import Configuration
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from eth_account import Account
+import threading
+import time
+
+# Account.decrypt namerno trosi mnogo procesorskog vremena (scrypt), pa se izvrsava u posebnim procesima, a ne u niti
+# zahteva koja bi drzala GIL i usporila sve ostale zahteve procesa; broj desifrovanja koja cekaju ili se izvrsavaju je
+# ogranicen, a zahtev preko tog broja se odmah odbija
+
+
+class KeystoreDecryptionBusy(Exception):
+    pass
+
+
+decryptionExecutorLock = threading.Lock()
+decryptionExecutor = None
+decryptionSlots = threading.BoundedSemaphore(Configuration.KEYSTORE_DECRYPTION_QUEUE_LIMIT)
+
+decryptionMetricsLock = threading.Lock()
+decryptionMetrics = {
+    "decryptions": 0,
+    "rejectedDecryptions": 0,
+    "failedDecryptions": 0,
+    "totalDecryptTime": 0.0,
+    "maximumDecryptTime": 0.0,
+    "totalQueueWait": 0.0,
+    "maximumQueueWait": 0.0
+}
+
+
+def decryptInWorker(ethereumKeys, ethereumPassphrase, submittedAt):
+    startedAt = time.time()
+    try:
+        customerEthereumPrivateKey = Account.decrypt(ethereumKeys, ethereumPassphrase).hex()
+    except ValueError:
+        return None, startedAt - submittedAt, time.time() - startedAt
+    return customerEthereumPrivateKey, startedAt - submittedAt, time.time() - startedAt
+
+
+def getDecryptionExecutor():
+    global decryptionExecutor
+    with decryptionExecutorLock:
+        if decryptionExecutor is None:
+            decryptionExecutor = ProcessPoolExecutor(max_workers=Configuration.KEYSTORE_DECRYPTION_PROCESSES)
+        return decryptionExecutor
+
+
+def resetDecryptionExecutor(brokenExecutor):
+    global decryptionExecutor
+    with decryptionExecutorLock:
+        if decryptionExecutor is brokenExecutor:
+            decryptionExecutor = None
+
+
+def recordDecryption(queueWait, decryptTime, failed):
+    with decryptionMetricsLock:
+        decryptionMetrics["decryptions"] += 1
+        if failed:
+            decryptionMetrics["failedDecryptions"] += 1
+        decryptionMetrics["totalDecryptTime"] += decryptTime
+        decryptionMetrics["maximumDecryptTime"] = max(decryptionMetrics["maximumDecryptTime"], decryptTime)
+        decryptionMetrics["totalQueueWait"] += queueWait
+        decryptionMetrics["maximumQueueWait"] = max(decryptionMetrics["maximumQueueWait"], queueWait)
+
+
+def getDecryptionMetrics():
+    with decryptionMetricsLock:
+        return dict(decryptionMetrics)
+
+
+def decryptPrivateKey(ethereumKeys, ethereumPassphrase):
+    # kao Account.decrypt(...).hex(), pogresna lozinka ili neispravni kljucevi bacaju ValueError
+    if not decryptionSlots.acquire(blocking=False):
+        with decryptionMetricsLock:
+            decryptionMetrics["rejectedDecryptions"] += 1
+        raise KeystoreDecryptionBusy()
+    try:
+        executor = getDecryptionExecutor()
+        try:
+            customerEthereumPrivateKey, queueWait, decryptTime = executor.submit(
+                decryptInWorker, ethereumKeys, ethereumPassphrase, time.time()
+            ).result()
+        except BrokenProcessPool:
+            # neki od procesa je ugasen, sledeci zahtev pravi novi skup procesa
+            resetDecryptionExecutor(executor)
+            raise
+    finally:
+        decryptionSlots.release()
+
+    recordDecryption(queueWait, decryptTime, customerEthereumPrivateKey is None)
+    if customerEthereumPrivateKey is None:
+        raise ValueError("Invalid credentials.")
+    return customerEthereumPrivateKey
@@ -7,6 +7,12 @@ database = SQLAlchemy()
 
 class ProductCategory(database.Model):
     __tablename__ = "productcategory"
+    # par (proizvod, kategorija) se upisuje samo jednom; jedinstveni indeks sluzi i za kategorije proizvoda (/status,
+    # pretraga, statistika), a drugi indeks za proizvode kategorije
+    __table_args__ = (
+        database.Index("ix_productcategory_productId_categoryId", "productId", "categoryId", unique=True),
+        database.Index("ix_productcategory_categoryId_productId", "categoryId", "productId")
+    )
     id = database.Column(database.Integer, primary_key=True)
     productId = database.Column(database.Integer, database.ForeignKey("products.id"), nullable=False)
     categoryId = database.Column(database.Integer, database.ForeignKey("categories.id"), nullable=False)
@@ -14,6 +20,12 @@ class ProductCategory(database.Model):
 
 class ProductOrder(database.Model):
     __tablename__ = "productorder"
+    # pokrivajuci indeksi: stavke narudzbine (/status, statistika pri isporuci) i narudzbine proizvoda se citaju samo
+    # iz indeksa, bez pristupa redovima tabele
+    __table_args__ = (
+        database.Index("ix_productorder_orderId_productId_quantity", "orderId", "productId", "quantity"),
+        database.Index("ix_productorder_productId_orderId_quantity", "productId", "orderId", "quantity")
+    )
     id = database.Column(database.Integer, primary_key=True)
     productId = database.Column(database.Integer, database.ForeignKey("products.id"), nullable=False)
     orderId = database.Column(database.Integer, database.ForeignKey("orders.id"), nullable=False)
@@ -40,11 +52,72 @@ class Category(database.Model):
 
 class Order(database.Model):
     __tablename__ = "orders"
+    # narudzbine kupca po id-u (/status sa kursorom) i narudzbine u datom statusu po id-u (kurir, contractDeployer)
+    __table_args__ = (
+        database.Index("ix_orders_buyerEmail_id", "buyerEmail", "id"),
+        database.Index("ix_orders_orderStatus_id", "orderStatus", "id")
+    )
     id = database.Column(database.Integer, primary_key=True)
     totalOrderPrice = database.Column(Float, nullable=False)
     orderStatus = database.Column(database.String(256), nullable=False)
     orderCreationTime = database.Column(DateTime, nullable=False)
+    # vreme (UTC) poslednje izmene narudzbine, za /status?since=...; narudzbine upisane pre ove kolone ga nemaju, pa se
+    # za njih koristi vreme kreiranja
+    orderUpdateTime = database.Column(DateTime, nullable=True)
     buyerEmail = database.Column(database.String(256), nullable=False)
-    ethereumContractAddress = database.Column(database.String(256), nullable=False)
+    customerEthereumAddress = database.Column(database.String(256), nullable=True)
+    # indeks je potreban indekseru dogadjaja, koji narudzbinu trazi po adresi ugovora koji je emitovao dogadjaj
+    ethereumContractAddress = database.Column(database.String(256), nullable=False, index=True)
+    # hes i vreme slanja (UTC) transakcije kojom se postavlja ugovor, dok je narudzbina u statusu DEPLOYING
+    ethereumTransactionHash = database.Column(database.String(256), nullable=True)
+    ethereumTransactionTime = database.Column(DateTime, nullable=True)
+    # hesevi (odvojeni zarezom) ranijih transakcija za istu narudzbinu koje nisu mine-ovane na vreme; svaka od njih i
+    # dalje moze biti mine-ovana, pa se njihove potvrde proveravaju pre potvrde poslednje transakcije
+    ethereumPreviousTransactionHashes = database.Column(database.Text, nullable=True)
+    # postavlja se kada je uplata kupca potvrdjena u blockchain-u (iz /pay ili iz indeksera dogadjaja)
+    paid = database.Column(database.Boolean, nullable=False, default=False)
 
     products = database.relationship("Product", secondary=ProductOrder.__table__, back_populates="orders")
+
+
+class ProductStatistics(database.Model):
+    __tablename__ = "productstatistics"
+    productId = database.Column(
+        database.Integer, database.ForeignKey("products.id"), primary_key=True, autoincrement=False
+    )
+    sold = database.Column(database.Integer, nullable=False, default=0)
+    waiting = database.Column(database.Integer, nullable=False, default=0)
+
+
+class CategoryStatistics(database.Model):
+    __tablename__ = "categorystatistics"
+    categoryId = database.Column(
+        database.Integer, database.ForeignKey("categories.id"), primary_key=True, autoincrement=False
+    )
+    sold = database.Column(database.Integer, nullable=False, default=0)
+    waiting = database.Column(database.Integer, nullable=False, default=0)
+
+
+class DataVersion(database.Model):
+    __tablename__ = "dataversions"
+    # dovoljno dugacko i za "buyer:" + email kupca
+    name = database.Column(database.String(320), primary_key=True)
+    value = database.Column(database.BigInteger, nullable=False, default=0)
+
+
+class DeployedContract(database.Model):
+    __tablename__ = "deployedcontracts"
+    name = database.Column(database.String(256), primary_key=True)
+    address = database.Column(database.String(256), nullable=False)
+
+
+class NonceReservation(database.Model):
+    __tablename__ = "noncereservations"
+    address = database.Column(database.String(256), primary_key=True)
+    nextNonce = database.Column(database.BigInteger, nullable=False)
+
+
+class BlockCheckpoint(database.Model):
+    __tablename__ = "blockcheckpoints"
+    name = database.Column(database.String(256), primary_key=True)
+    blockNumber = database.Column(database.BigInteger, nullable=False)
@@ -0,0 +1,101 @@
+from configuration import Configuration, getWeb3, getOrderContractFactory, getOwnerEthereumAddress
+from web3 import Web3
+from models import database, DeployedContract
+from receiptWatcher import waitForTransactionReceipt
+from ownerTransactions import transactAsOwner
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+import threading
+
+ORDER_IMPLEMENTATION_CONTRACT_NAME = "OrderImplementation"
+
+# kod minimal proxy (EIP-1167) kopije, izmedju prefiksa i sufiksa je adresa implementacije; kopija svaki poziv
+# prosledjuje implementaciji preko delegatecall, pa se izvrsava kod Order ugovora nad stanjem (i balansom) kopije, a
+# dogadjaje emituje kopija
+MINIMAL_PROXY_CODE_PREFIX = "363d3d373d3d3d363d73"
+MINIMAL_PROXY_CODE_SUFFIX = "5af43d82803e903d91602b57fd5bf3"
+MINIMAL_PROXY_CODE_LENGTH = 45
+
+deployedContractAddressesLock = threading.Lock()
+deployedContractAddresses = dict()
+
+
+def waitForContractAddress(transactionHash):
+    return waitForTransactionReceipt(transactionHash).contractAddress
+
+
+def loadOrDeployContract(contractName, deployContract):
+    # koristi se posebna konekcija (a ne sesija zahteva), kako upis adrese ne bi potvrdio i izmene samog zahteva
+    deployedContracts = DeployedContract.__table__
+    addressQuery = select([deployedContracts.c.address]).where(deployedContracts.c.name == contractName)
+    deployedContract = database.engine.execute(addressQuery).first()
+    if deployedContract is not None:
+        return deployedContract.address
+
+    address = deployContract()
+    try:
+        database.engine.execute(deployedContracts.insert().values(name=contractName, address=address))
+    except IntegrityError:
+        # drugi proces je u medjuvremenu postavio i upisao svoj ugovor, koristi se taj
+        return database.engine.execute(addressQuery).first().address
+    return address
+
+
+def getDeployedContractAddress(contractName, configuredAddress, deployContract):
+    with deployedContractAddressesLock:
+        if contractName not in deployedContractAddresses:
+            if configuredAddress is not None:
+                deployedContractAddresses[contractName] = Web3.to_checksum_address(configuredAddress)
+            else:
+                deployedContractAddresses[contractName] = loadOrDeployContract(contractName, deployContract)
+        return deployedContractAddresses[contractName]
+
+
+def deployOrderImplementation():
+    # stanje same implementacije se ne koristi, svaka kopija ima svoje
+    return waitForContractAddress(transactAsOwner(getOrderContractFactory().constructor(getOwnerEthereumAddress(), 0)))
+
+
+def getOrderImplementationAddress():
+    return getDeployedContractAddress(
+        ORDER_IMPLEMENTATION_CONTRACT_NAME, Configuration.ORDER_IMPLEMENTATION_ADDRESS, deployOrderImplementation
+    )
+
+
+def getOrderCloneInitCode(implementationAddress, customerEthereumAddress, orderPriceInWei):
+    # Order ugovor nema funkciju za inicijalizaciju kopije, pa init kod kopije sam upisuje ono sto upisuje konstruktor
+    # Order ugovora: customerEthereumAddress u slot 0, ownerEthereumAddress (posiljalac transakcije) u slot 1 i
+    # orderPriceInWei u slot 3 (raspored promenljivih u order.sol); ostali slotovi ostaju 0, kao posle konstruktora
+    storageCode = "73" + Web3.to_bytes(hexstr=customerEthereumAddress).rjust(20, b"\0").hex() + "600055" \
+        + "33600155" \
+        + "7f" + orderPriceInWei.to_bytes(32, "big").hex() + "600355"
+    # CODECOPY kopira kod kopije (koji sledi iza ovih 11 bajtova) u memoriju, a RETURN ga vraca kao kod ugovora
+    returnCode = f"60{MINIMAL_PROXY_CODE_LENGTH:02x}8060{len(storageCode) // 2 + 11:02x}6000396000f3"
+    proxyCode = MINIMAL_PROXY_CODE_PREFIX + implementationAddress[2:].lower() + MINIMAL_PROXY_CODE_SUFFIX
+    return "0x" + storageCode + returnCode + proxyCode
+
+
+def getOrderCloneFactory(customerEthereumAddress, orderPriceInWei):
+    # init kod nema ABI, pa se kopija postavlja kao ugovor bez ABI-ja ciji je bytecode init kod kopije
+    return getWeb3().eth.contract(abi=[], bytecode=getOrderCloneInitCode(
+        getOrderImplementationAddress(), customerEthereumAddress, orderPriceInWei
+    ))
+
+
+def createOrderContract(customerEthereumAddress, orderPriceInWei):
+    if Configuration.ORDER_CONTRACT_MODE == "clone":
+        # kopija se postavlja jednom transakcijom vlasnika, kao i poseban Order ugovor, ali sa 45 bajtova koda
+        return transactAsOwner(getOrderCloneFactory(customerEthereumAddress, orderPriceInWei).constructor())
+
+    # vlasnik prodavnice kreira transakciju u kojoj dodaje ethereum pametni ugovor u blockchain
+    # receno u tekstu da vlasnik prodavnice snosi troskove kreiranja ugovora
+    return transactAsOwner(getOrderContractFactory().constructor(
+        customerEthereumAddress, orderPriceInWei
+        # receno u tekstu da ugovor treba vezati za kupca koji je kreirao narudzbinu
+    ))
+    # poziv transact metode automatski u pozadini potpisuje transakciju koristeci prosledjeni ethereum nalog tako sto
+    # na osnovu naloga zna njegov privatni kljuc pomocu kog se potpise transakcija
+
+
+def getOrderContractAddress(transactionReceipt):
+    return transactionReceipt.contractAddress
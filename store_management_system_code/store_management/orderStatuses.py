@@ -0,0 +1,174 @@
+from models import database, Product, Category, Order, ProductOrder, ProductCategory
+from sqlalchemy import and_, func
+from datetime import datetime, timezone
+
+import base64
+import binascii
+import json
+
+# narudzbine kupca se citaju u dva upita: prvi vraca narudzbine sa stavkama (red po stavci), a drugi kategorije samo za
+# razlicite proizvode iz tih stavki; spajanje svih pet tabela jednim upitom bi vracalo red za svaku kombinaciju
+# stavke i kategorije, pa bi rezultat rastao sa proizvodom broja stavki i broja kategorija
+
+# najveci broj id-eva proizvoda u jednom IN uslovu upita za kategorije
+PRODUCT_CATEGORIES_QUERY_CHUNK_SIZE = 1000
+
+ORDER_STATUSES = ["DEPLOYING", "CREATED", "PENDING", "COMPLETE"]
+
+
+def encodeOrderCursor(orderId):
+    # kao i kod pretrage, kursor je neprozirna vrednost za klijenta i sadrzi id poslednje vracene narudzbine
+    return base64.urlsafe_b64encode(json.dumps({"orderId": orderId}).encode()).decode()
+
+
+def decodeOrderCursor(cursor):
+    try:
+        orderId = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())["orderId"]
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+        return None
+    if type(orderId) is not int or orderId < 0:
+        return None
+    return orderId
+
+
+def parseOrderTime(orderTime):
+    # vremena narudzbine se cuvaju u UTC bez vremenske zone, pa se i zadato vreme svodi na isti oblik
+    try:
+        orderTime = datetime.fromisoformat(orderTime[:-1] + "+00:00" if orderTime.endswith("Z") else orderTime)
+    except ValueError:
+        return None
+    if orderTime.tzinfo is not None:
+        orderTime = orderTime.astimezone(timezone.utc).replace(tzinfo=None)
+    return orderTime
+
+
+def getOrderCondition(buyerEmail, orderStatuses, sinceTime, afterOrderId):
+    orderCondition = and_(Order.buyerEmail == buyerEmail, Order.id > afterOrderId)
+    if orderStatuses is not None:
+        orderCondition = and_(orderCondition, Order.orderStatus.in_(orderStatuses))
+    if sinceTime is not None:
+        # narudzbine koje su kreirane ili izmenjene (postavljen ugovor, preuzimanje, isporuka) od zadatog vremena
+        orderCondition = and_(
+            orderCondition, func.coalesce(Order.orderUpdateTime, Order.orderCreationTime) >= sinceTime
+        )
+    return orderCondition
+
+
+def getOrderIdPage(orderCondition, limit):
+    # limit se odnosi na narudzbine (ne na stavke), pa se u bazi najpre bira stranica id-eva narudzbina; jedna
+    # narudzbina vise govori da postoji sledeca stranica
+    orderIds = [orderId for orderId, in database.session.query(
+        Order.id
+    ).filter(
+        orderCondition
+    ).order_by(
+        Order.id
+    ).limit(limit + 1).all()]
+    return orderIds[:limit], len(orderIds) > limit
+
+
+def getOrderSummaries(orderCondition):
+    orders = database.session.query(
+        Order.id, Order.orderStatus, Order.totalOrderPrice
+    ).filter(
+        orderCondition
+    ).order_by(
+        Order.id
+    ).all()
+    return {"orders": [
+        {"id": order.id, "price": order.totalOrderPrice, "status": order.orderStatus} for order in orders
+    ]}
+
+
+def getOrderLines(orderCondition):
+    return database.session.query(
+        Order.id.label("OrderId"),
+        Order.totalOrderPrice.label("TotalOrderPrice"),
+        Order.orderStatus.label("OrderStatus"),
+        Order.orderCreationTime.label("OrderCreationTime"),
+        Product.id.label("ProductId"),
+        Product.productName.label("ProductName"),
+        Product.productPrice.label("ProductPrice"),
+        ProductOrder.quantity.label("Quantity")
+    ).join(
+        ProductOrder, Order.id == ProductOrder.orderId
+    ).join(
+        Product, ProductOrder.productId == Product.id
+    ).filter(
+        orderCondition
+    ).order_by(
+        Order.id, Product.id
+    ).all()
+
+
+def getProductCategoryNames(productIds):
+    productIds = sorted(productIds)
+    productCategoryNames = dict()
+    for chunkStart in range(0, len(productIds), PRODUCT_CATEGORIES_QUERY_CHUNK_SIZE):
+        productCategories = database.session.query(
+            ProductCategory.productId.label("ProductId"),
+            Category.categoryName.label("CategoryName")
+        ).join(
+            Category, ProductCategory.categoryId == Category.id
+        ).filter(
+            ProductCategory.productId.in_(productIds[chunkStart:chunkStart + PRODUCT_CATEGORIES_QUERY_CHUNK_SIZE])
+        ).order_by(
+            ProductCategory.productId, Category.categoryName
+        ).all()
+        for productCategory in productCategories:
+            productCategoryNames.setdefault(productCategory.ProductId, []).append(productCategory.CategoryName)
+    return productCategoryNames
+
+
+def buildOrderStatuses(orderLines, productCategoryNames, includeOrderIds):
+    # stavke su sortirane po narudzbini, pa je dovoljno porediti sa poslednjom dodatom narudzbinom; kao i ranije,
+    # proizvod bez kategorija se ne prikazuje, a ni narudzbina bez prikazanih proizvoda
+    response = {"orders": []}
+    previousOrderId = None
+    currentOrder = None
+    for orderLine in orderLines:
+        categoryNames = productCategoryNames.get(orderLine.ProductId, None)
+        if categoryNames is None:
+            continue
+        if orderLine.OrderId != previousOrderId:
+            currentOrder = {
+                "products": [],
+                "price": orderLine.TotalOrderPrice,
+                "status": orderLine.OrderStatus,
+                "timestamp": orderLine.OrderCreationTime
+            }
+            if includeOrderIds:
+                currentOrder["id"] = orderLine.OrderId
+            response["orders"].append(currentOrder)
+            previousOrderId = orderLine.OrderId
+        currentOrder["products"].append({
+            "categories": list(categoryNames),
+            "name": orderLine.ProductName,
+            "price": orderLine.ProductPrice,
+            "quantity": orderLine.Quantity
+        })
+    return response
+
+
+def getOrderStatuses(buyerEmail, orderStatuses=None, sinceTime=None, afterOrderId=0, limit=None, summary=False):
+    # bez filtera i limita se vraca cela istorija narudzbina kupca, u istom obliku kao ranije (bez id-a narudzbine);
+    # inace se id vraca i uz pune narudzbine, kako bi klijent mogao da ih poveze sa narudzbinama iz drugih stranica
+    # i ranijih odgovora
+    orderCondition = getOrderCondition(buyerEmail, orderStatuses, sinceTime, afterOrderId)
+    includeOrderIds = orderStatuses is not None or sinceTime is not None or afterOrderId > 0 or limit is not None
+    hasMoreOrders = False
+    if limit is not None:
+        orderIds, hasMoreOrders = getOrderIdPage(orderCondition, limit)
+        orderCondition = Order.id.in_(orderIds)
+
+    if summary:
+        response = getOrderSummaries(orderCondition)
+    else:
+        orderLines = getOrderLines(orderCondition)
+        productCategoryNames = getProductCategoryNames({orderLine.ProductId for orderLine in orderLines})
+        response = buildOrderStatuses(orderLines, productCategoryNames, includeOrderIds)
+
+    # kursor za sledecu stranicu se vraca samo kada je klijent trazio stranicenje
+    if limit is not None:
+        response["cursor"] = encodeOrderCursor(orderIds[-1]) if hasMoreOrders else None
+    return response
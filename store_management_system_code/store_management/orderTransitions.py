@@ -0,0 +1,57 @@
+from models import database, Order
+from salesStatistics import addSoldQuantities
+from dataVersions import bumpDataVersions, getBuyerDataVersionName, STORE_DATA_VERSION
+from sqlalchemy import and_
+from datetime import datetime
+
+# prelazi narudzbine se primenjuju uslovnim UPDATE naredbama, pa je svaki prelaz idempotentan: i zahtev koji je poslao
+# transakciju i indekser dogadjaja ugovora mogu da ga primene, a statistika se menja samo pri prvoj primeni
+# funkcije iz ovog modula ne rade commit, to je odgovornost pozivaoca
+
+
+def updateOrder(orderId, condition, **values):
+    orders = Order.__table__
+    result = database.session.execute(
+        orders.update().where(
+            and_(orders.c.id == orderId, condition)
+        ).values(
+            orderUpdateTime=datetime.utcnow(), **values
+        )
+    )
+    return result.rowcount == 1
+
+
+def getOrderBuyerDataVersionName(orderId):
+    buyerEmail = database.session.query(Order.buyerEmail).filter(Order.id == orderId).scalar()
+    return getBuyerDataVersionName(buyerEmail)
+
+
+def recordDataVersionChanges(dataVersionNames, changedDataVersionNames):
+    # pozivalac koji u jednoj transakciji primenjuje vise prelaza (indekser) prosledjuje skup u koji se brojaci samo
+    # dodaju, pa ih uvecava sve zajedno neposredno pre commit-a; inace se brojaci uvecavaju odmah
+    if dataVersionNames is None:
+        bumpDataVersions(changedDataVersionNames)
+    else:
+        dataVersionNames.update(changedDataVersionNames)
+
+
+def markOrderPaid(orderId, dataVersionNames=None):
+    return updateOrder(orderId, Order.__table__.c.paid.is_(False), paid=True)
+
+
+def markOrderPickedUp(orderId, dataVersionNames=None):
+    if not updateOrder(orderId, Order.__table__.c.orderStatus == "CREATED", orderStatus="PENDING"):
+        return False
+    # preuzeta narudzbina je i dalje neisporucena, pa se statistika ne menja
+    recordDataVersionChanges(dataVersionNames, [getOrderBuyerDataVersionName(orderId)])
+    return True
+
+
+def markOrderDelivered(orderId, dataVersionNames=None):
+    if not updateOrder(orderId, Order.__table__.c.orderStatus == "PENDING", orderStatus="COMPLETE"):
+        return False
+    changedDataVersionNames = [getOrderBuyerDataVersionName(orderId)]
+    if addSoldQuantities(orderId):
+        changedDataVersionNames.append(STORE_DATA_VERSION)
+    recordDataVersionChanges(dataVersionNames, changedDataVersionNames)
+    return True
@@ -5,6 +5,7 @@ from flask_jwt_extended import JWTManager, jwt_required
 from requests import request as httpRequest
 import json
 from decorators import roleCheck
+from dataVersions import bumpDataVersion, STORE_DATA_VERSION, CATALOG_DATA_VERSION
 
 OWNER_ROLE_ID_STRING = "2"
 
@@ -55,6 +56,17 @@ def category_statistics():
     return jsonify(json.loads(response.text)), 200
 
 
+@application.route("/statistics", methods=["GET"])
+@jwt_required()
+@roleCheck(OWNER_ROLE_ID_STRING)
+def statistics():
+    response = httpRequest(
+        method="get",
+        url="http://sparkApplication:5004/statistics"
+    )
+    return jsonify(json.loads(response.text)), 200
+
+
 def isFloat(stringRepresentation):
     try:
         float(stringRepresentation)
@@ -126,6 +138,8 @@ def getNewProductCategoryObjects(productCategoriesDictionary):
 def insertProductCategories(productCategoriesDictionary):
     newProductCategoryObjects = getNewProductCategoryObjects(productCategoriesDictionary)
     database.session.bulk_save_objects(newProductCategoryObjects)
+    bumpDataVersion(STORE_DATA_VERSION)
+    bumpDataVersion(CATALOG_DATA_VERSION)
     database.session.commit()
 
 
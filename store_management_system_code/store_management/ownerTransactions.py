@@ -0,0 +1,153 @@
+from configuration import Configuration, getWeb3, getOwnerEthereumAddress
+from models import database, NonceReservation
+from sqlalchemy import and_, select
+from sqlalchemy.exc import IntegrityError
+from web3.exceptions import ContractLogicError
+import sys
+
+# brojac se menja preko posebne konekcije (a ne sesije zahteva) i zakljucava se samo dok se nonce ne dodeli, pa
+# transakcije vlasnika iz razlicitih procesa cekaju jedna na drugu samo toliko, a ne dok transakcija ne bude mine-ovana
+
+
+def readChainNonce(blockIdentifier="pending"):
+    # "pending" uracunava i transakcije koje su poslate, ali jos nisu mine-ovane
+    return getWeb3().eth.get_transaction_count(getOwnerEthereumAddress(), blockIdentifier)
+
+
+def selectNonceReservation(connection):
+    nonceReservations = NonceReservation.__table__
+    return connection.execute(
+        select([nonceReservations.c.nextNonce]).where(
+            nonceReservations.c.address == getOwnerEthereumAddress()
+        ).with_for_update()
+    ).first()
+
+
+def updateNonceReservation(connection, nextNonce):
+    nonceReservations = NonceReservation.__table__
+    connection.execute(
+        nonceReservations.update().where(
+            nonceReservations.c.address == getOwnerEthereumAddress()
+        ).values(nextNonce=nextNonce)
+    )
+
+
+def allocateOwnerNonce():
+    try:
+        with database.engine.begin() as connection:
+            nonceReservation = selectNonceReservation(connection)
+            if nonceReservation is None:
+                nonce = readChainNonce()
+                connection.execute(NonceReservation.__table__.insert().values(
+                    address=getOwnerEthereumAddress(), nextNonce=nonce + 1
+                ))
+                return nonce
+            updateNonceReservation(connection, nonceReservation.nextNonce + 1)
+            return nonceReservation.nextNonce
+    except IntegrityError:
+        # drugi proces je u medjuvremenu napravio brojac, pa se nonce dodeljuje iz njega
+        return allocateOwnerNonce()
+
+
+def releaseOwnerNonce(nonce):
+    # nonce neposlate transakcije se vraca brojacu samo ako posle njega nije dodeljen nijedan drugi
+    nonceReservations = NonceReservation.__table__
+    with database.engine.begin() as connection:
+        return connection.execute(
+            nonceReservations.update().where(and_(
+                nonceReservations.c.address == getOwnerEthereumAddress(),
+                nonceReservations.c.nextNonce == nonce + 1
+            )).values(nextNonce=nonce)
+        ).rowcount == 1
+
+
+def fillOwnerNonce(nonce):
+    # posle nonce-a su vec dodeljeni drugi, pa bi bez transakcije sa ovim nonce-om sve kasnije transakcije vlasnika
+    # ostale zaglavljene kod cvora; prazna transakcija vlasnika samom sebi popunjava prazninu
+    if releaseOwnerNonce(nonce):
+        return
+    try:
+        getWeb3().eth.send_transaction({
+            "from": getOwnerEthereumAddress(),
+            "to": getOwnerEthereumAddress(),
+            "value": 0,
+            "nonce": nonce
+        })
+    except Exception as exception:
+        # prazninu ce popuniti repairOwnerNonceGap
+        print(f"Owner nonce {nonce} could not be filled: {exception}", file=sys.stderr)
+
+
+def repairOwnerNonceGap(observedNonceGap, now):
+    # brojac ispred nonce-a koji cvor ocekuje, bez transakcija vlasnika na cekanju, je normalan samo dok proces koji je
+    # upravo dobio nonce ne posalje transakciju; ako isto stanje traje OWNER_NONCE_GAP_TIMEOUT sekundi, nonce je
+    # izgubljen, pa se brojac vraca na nonce koji cvor ocekuje; vraca se stanje koje se prosledjuje sledecem pozivu
+    with database.engine.begin() as connection:
+        nonceReservation = selectNonceReservation(connection)
+        if nonceReservation is None:
+            return None
+        pendingNonce = readChainNonce()
+        if pendingNonce >= nonceReservation.nextNonce or readChainNonce("latest") != pendingNonce:
+            return None
+        nonceGap = (nonceReservation.nextNonce, pendingNonce)
+        if observedNonceGap is None or observedNonceGap[:2] != nonceGap:
+            return nonceGap + (now,)
+        if now - observedNonceGap[2] < Configuration.OWNER_NONCE_GAP_TIMEOUT:
+            return observedNonceGap
+        # transakcije koje su poslate sa vecim nonce-om cekaju kod cvora, pa prvi sledeci nonce posle popunjene
+        # praznine dobija gresku nonce-a, a resyncOwnerNonce tada pomera brojac iza njih
+        updateNonceReservation(connection, pendingNonce)
+        print(f"Owner nonce counter moved back from {nonceReservation.nextNonce} to {pendingNonce}", file=sys.stderr)
+        return None
+
+
+# poruke kojima cvor odbija transakciju ciji je nonce vec iskoriscen (geth i ganache)
+NONCE_ERROR_MESSAGES = ["nonce too low", "already known", "correct nonce", "replacement transaction underpriced"]
+
+
+def isNonceError(exception):
+    if not isinstance(exception, ValueError) or isinstance(exception, ContractLogicError):
+        return False
+    error = exception.args[0] if len(exception.args) > 0 else ""
+    message = error.get("message", "") if isinstance(error, dict) else str(error)
+    return any(nonceErrorMessage in message.lower() for nonceErrorMessage in NONCE_ERROR_MESSAGES)
+
+
+def resyncOwnerNonce():
+    # nonce je vec iskoriscen transakcijom vlasnika poslatom mimo ovog brojaca, pa se brojac pomera do nonce-a koji
+    # cvor ocekuje; brojac se nikad ne vraca unazad, jer bi tada ponovo dodelio nonce-ove transakcija koje su drugi
+    # procesi upravo poslali
+    with database.engine.begin() as connection:
+        nonceReservation = selectNonceReservation(connection)
+        if nonceReservation is not None:
+            updateNonceReservation(connection, max(nonceReservation.nextNonce, readChainNonce()))
+
+
+def transactAsOwner(contractCall):
+    if not Configuration.OWNER_NONCE_MANAGER:
+        return contractCall.transact({
+            "from": getOwnerEthereumAddress()
+        })
+
+    # gas se procenjuje pre dodele nonce-a, pa poziv koji bi bio odbijen (revert) baca ContractLogicError pre nego sto
+    # potrosi nonce
+    gas = contractCall.estimate_gas({
+        "from": getOwnerEthereumAddress()
+    })
+    for attempt in range(Configuration.OWNER_TRANSACTION_ATTEMPTS):
+        nonce = allocateOwnerNonce()
+        try:
+            return contractCall.transact({
+                "from": getOwnerEthereumAddress(),
+                "nonce": nonce,
+                "gas": gas
+            })
+        except Exception as exception:
+            # samo greska nonce-a se resava ponovnim slanjem, ostale greske se prosledjuju, a nonce koji transakcija
+            # nije iskoristila se vraca ili popunjava
+            if not isNonceError(exception):
+                fillOwnerNonce(nonce)
+                raise
+            if attempt == Configuration.OWNER_TRANSACTION_ATTEMPTS - 1:
+                raise
+            resyncOwnerNonce()
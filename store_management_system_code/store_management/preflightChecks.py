@@ -0,0 +1,47 @@
+from configuration import Configuration, getWeb3
+from collections import OrderedDict
+from web3.exceptions import ContractLogicError
+import threading
+
+# poziv funkcije ugovora se pre potpisivanja (i pre desifrovanja kljuceva kupca) izvrsava preko eth_call, pa se zahtev
+# koji bi ugovor odbio odbija odmah, sa istom porukom koju bi vratila i prava transakcija; rezultat zavisi samo od
+# stanja lanca u datom bloku, pa se kesira po adresi ugovora, bloku, funkciji, argumentima, posiljaocu i vrednosti
+
+preflightResultsLock = threading.Lock()
+preflightResults = OrderedDict()
+
+
+def getCachedPreflightResult(cacheKey):
+    with preflightResultsLock:
+        if cacheKey not in preflightResults:
+            return None
+        preflightResults.move_to_end(cacheKey)
+        return preflightResults[cacheKey]
+
+
+def cachePreflightResult(cacheKey, errorMessage):
+    with preflightResultsLock:
+        preflightResults[cacheKey] = errorMessage
+        preflightResults.move_to_end(cacheKey)
+        while len(preflightResults) > Configuration.PREFLIGHT_CACHE_SIZE:
+            preflightResults.popitem(last=False)
+
+
+def preflightContractCall(contractFunction, transaction):
+    blockNumber = getWeb3().eth.block_number
+    cacheKey = (
+        contractFunction.address, blockNumber, contractFunction.fn_name, tuple(contractFunction.args),
+        transaction.get("from", None), transaction.get("value", 0)
+    )
+    errorMessage = getCachedPreflightResult(cacheKey)
+    if errorMessage is not None:
+        return errorMessage
+
+    try:
+        contractFunction.call(transaction, block_identifier=blockNumber)
+        errorMessage = ""
+    except ContractLogicError as contractLogicError:
+        contractLogicErrorString = str(contractLogicError)
+        errorMessage = contractLogicErrorString[contractLogicErrorString.find("revert ") + 7:]
+    cachePreflightResult(cacheKey, errorMessage)
+    return errorMessage
@@ -0,0 +1,147 @@
+from configuration import Configuration, getWeb3
+from concurrent.futures import Future
+from hexbytes import HexBytes
+from web3.exceptions import TransactionNotFound, TimeExhausted
+import sys
+import threading
+import time
+
+
+class PendingTransaction:
+    def __init__(self, deadline):
+        self.future = Future()
+        self.deadline = deadline
+        # transakcija je mozda mine-ovana pre nego sto je prijavljena, pa se njena potvrda jednom cita direktno
+        self.checkedDirectly = False
+
+
+class ReceiptWatcher:
+    # jedna nit po procesu prati nove blokove i budi sve zahteve koji cekaju potvrde svojih transakcija, umesto da
+    # svaki zahtev posebno ispituje cvor; dok nema transakcija koje se cekaju nit ne salje nijedan upit cvoru
+    def __init__(self, getWeb3, pollInterval, timeout):
+        # cvoru se pristupa tek kada nit pocne da prati transakcije
+        self.getWeb3 = getWeb3
+        self.pollInterval = pollInterval
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.pendingTransactions = dict()
+        self.thread = None
+        self.lastBlockNumber = None
+        self.counters = {
+            "watchedTransactions": 0,
+            "receivedReceipts": 0,
+            "timedOutTransactions": 0,
+            "scannedBlocks": 0
+        }
+
+    def watch(self, transactionHash):
+        transactionHash = HexBytes(transactionHash).hex()
+        deadline = time.monotonic() + self.timeout
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            pendingTransaction = self.pendingTransactions.get(transactionHash, None)
+            if pendingTransaction is None:
+                pendingTransaction = PendingTransaction(deadline)
+                self.pendingTransactions[transactionHash] = pendingTransaction
+                self.counters["watchedTransactions"] += 1
+            pendingTransaction.deadline = max(pendingTransaction.deadline, deadline)
+            return pendingTransaction.future
+
+    def waitForTransactionReceipt(self, transactionHash):
+        # kao web3.eth.wait_for_transaction_receipt, posle isteka vremena se baca TimeExhausted
+        return self.watch(transactionHash).result()
+
+    def getCounters(self):
+        with self.lock:
+            return dict(self.counters, pendingTransactions=len(self.pendingTransactions))
+
+    def resolve(self, transactionHash, transactionReceipt):
+        with self.lock:
+            pendingTransaction = self.pendingTransactions.pop(transactionHash, None)
+            if pendingTransaction is None:
+                return
+            self.counters["receivedReceipts"] += 1
+        pendingTransaction.future.set_result(transactionReceipt)
+
+    def expire(self, now):
+        with self.lock:
+            expiredTransactionHashes = [
+                transactionHash for transactionHash, pendingTransaction in self.pendingTransactions.items()
+                if pendingTransaction.deadline <= now
+            ]
+            expiredTransactions = [
+                (transactionHash, self.pendingTransactions.pop(transactionHash))
+                for transactionHash in expiredTransactionHashes
+            ]
+            self.counters["timedOutTransactions"] += len(expiredTransactions)
+        for transactionHash, pendingTransaction in expiredTransactions:
+            pendingTransaction.future.set_exception(TimeExhausted(
+                f"Transaction {transactionHash} is not in the chain after {self.timeout} seconds"
+            ))
+
+    def readReceipt(self, transactionHash):
+        try:
+            return self.getWeb3().eth.get_transaction_receipt(transactionHash)
+        except TransactionNotFound:
+            return None
+
+    def poll(self):
+        with self.lock:
+            if len(self.pendingTransactions) == 0:
+                # nove transakcije se uvek prvo proveravaju direktno, pa blokove mine-ovane dok se nista nije cekalo
+                # ne treba pregledati
+                self.lastBlockNumber = None
+                return
+            newTransactionHashes = [
+                transactionHash for transactionHash, pendingTransaction in self.pendingTransactions.items()
+                if not pendingTransaction.checkedDirectly
+            ]
+
+        # broj bloka se cita pre direktnih provera, pa je svaka transakcija koja direktno nije nadjena mine-ovana u
+        # nekom od blokova koji ce tek biti pregledani
+        blockNumber = self.getWeb3().eth.block_number
+        if self.lastBlockNumber is None:
+            self.lastBlockNumber = blockNumber
+
+        for transactionHash in newTransactionHashes:
+            transactionReceipt = self.readReceipt(transactionHash)
+            with self.lock:
+                pendingTransaction = self.pendingTransactions.get(transactionHash, None)
+                if pendingTransaction is not None:
+                    pendingTransaction.checkedDirectly = True
+            if transactionReceipt is not None:
+                self.resolve(transactionHash, transactionReceipt)
+
+        for newBlockNumber in range(self.lastBlockNumber + 1, blockNumber + 1):
+            with self.lock:
+                if len(self.pendingTransactions) == 0:
+                    break
+            for transactionHash in self.getWeb3().eth.get_block(newBlockNumber)["transactions"]:
+                transactionHash = HexBytes(transactionHash).hex()
+                with self.lock:
+                    isPending = transactionHash in self.pendingTransactions
+                if isPending:
+                    self.resolve(transactionHash, self.getWeb3().eth.get_transaction_receipt(transactionHash))
+            with self.lock:
+                self.counters["scannedBlocks"] += 1
+        self.lastBlockNumber = blockNumber
+
+    def run(self):
+        while True:
+            try:
+                self.poll()
+            except Exception as exception:
+                print(f"Receipt watcher poll failed: {exception}", file=sys.stderr)
+            self.expire(time.monotonic())
+            time.sleep(self.pollInterval)
+
+
+receiptWatcher = ReceiptWatcher(
+    getWeb3, Configuration.RECEIPT_WATCHER_POLL_INTERVAL, Configuration.RECEIPT_WATCHER_TIMEOUT
+)
+
+
+def waitForTransactionReceipt(transactionHash):
+    return receiptWatcher.waitForTransactionReceipt(transactionHash)
@@ -0,0 +1,72 @@
+from models import database, ProductCategory, ProductOrder, ProductStatistics, CategoryStatistics
+from sqlalchemy import bindparam
+from sqlalchemy.dialects.mysql import insert
+
+# materijalizovane kolicine sold/waiting po proizvodu i po kategoriji se azuriraju u istoj transakciji u kojoj se
+# menjaju i same narudzbine, pa statistika ne mora da spaja svih pet tabela pri svakom zahtevu; spark poslovi za
+# statistiku ostaju samo kao put za potpunu ponovnu izgradnju ovih tabela
+# funkcije iz ovog modula ne rade commit, to je odgovornost pozivaoca, a vracaju da li su kolicine promenjene
+
+
+def getCategoryQuantities(productQuantities):
+    categoryQuantities = dict()
+    productCategories = ProductCategory.query.filter(
+        ProductCategory.productId.in_(list(productQuantities.keys()))
+    ).all()
+    for productCategory in productCategories:
+        categoryQuantities[productCategory.categoryId] = \
+            categoryQuantities.get(productCategory.categoryId, 0) + productQuantities[productCategory.productId]
+    return categoryQuantities
+
+
+def upsertWaitingQuantities(statisticsTable, keyColumnName, quantities):
+    # redovi se obradjuju u rastucem redosledu kljuca kako bi istovremene narudzbine zakljucavale redove istim
+    # redosledom i time izbegle deadlock
+    insertStatement = insert(statisticsTable).values([
+        {keyColumnName: key, "sold": 0, "waiting": quantities[key]} for key in sorted(quantities.keys())
+    ])
+    database.session.execute(insertStatement.on_duplicate_key_update(
+        waiting=statisticsTable.c.waiting + insertStatement.inserted.waiting
+    ))
+
+
+def moveWaitingQuantitiesToSold(statisticsTable, keyColumnName, quantities):
+    updateStatement = statisticsTable.update().where(
+        statisticsTable.c[keyColumnName] == bindparam("statisticsKey")
+    ).values(
+        sold=statisticsTable.c.sold + bindparam("statisticsQuantity"),
+        waiting=statisticsTable.c.waiting - bindparam("statisticsQuantity")
+    )
+    database.session.execute(updateStatement, [
+        {"statisticsKey": key, "statisticsQuantity": quantities[key]} for key in sorted(quantities.keys())
+    ])
+
+
+def addOrderedQuantities(requests):
+    productQuantities = dict()
+    for currentRequest in requests:
+        productQuantities[currentRequest["id"]] = \
+            productQuantities.get(currentRequest["id"], 0) + currentRequest["quantity"]
+    if len(productQuantities) == 0:
+        return False
+
+    upsertWaitingQuantities(ProductStatistics.__table__, "productId", productQuantities)
+    categoryQuantities = getCategoryQuantities(productQuantities)
+    if len(categoryQuantities) > 0:
+        upsertWaitingQuantities(CategoryStatistics.__table__, "categoryId", categoryQuantities)
+    return True
+
+
+def addSoldQuantities(orderId):
+    productQuantities = dict()
+    for productOrder in ProductOrder.query.filter(ProductOrder.orderId == orderId).all():
+        productQuantities[productOrder.productId] = \
+            productQuantities.get(productOrder.productId, 0) + productOrder.quantity
+    if len(productQuantities) == 0:
+        return False
+
+    moveWaitingQuantitiesToSold(ProductStatistics.__table__, "productId", productQuantities)
+    categoryQuantities = getCategoryQuantities(productQuantities)
+    if len(categoryQuantities) > 0:
+        moveWaitingQuantitiesToSold(CategoryStatistics.__table__, "categoryId", categoryQuantities)
+    return True
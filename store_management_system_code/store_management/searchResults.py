@@ -0,0 +1,69 @@
+from collections import namedtuple
+
+import base64
+import binascii
+import json
+
+# jedan red rezultata pretrage (proizvod sa jednom od svojih kategorija), isti oblik kao redovi SQL upita pretrage
+SearchRow = namedtuple("SearchRow", ["ProductId", "ProductName", "ProductPrice", "CategoryName"])
+
+
+def createProductDictionary(searchRow):
+    return {
+        "categories": [searchRow.CategoryName],
+        "id": searchRow.ProductId,
+        "name": searchRow.ProductName,
+        "price": searchRow.ProductPrice
+    }
+
+
+def buildSearchResult(searchRows):
+    # recnici cuvaju redosled umetanja, pa kategorije i proizvodi ostaju u redosledu prvog pojavljivanja, a provera
+    # da li je nesto vec dodato je O(1) umesto prolaska kroz liste
+    categoryNames = dict()
+    products = dict()
+    for searchRow in searchRows:
+        categoryNames[searchRow.CategoryName] = None
+        product = products.get(searchRow.ProductId, None)
+        if product is None:
+            products[searchRow.ProductId] = createProductDictionary(searchRow)
+        else:
+            product["categories"].append(searchRow.CategoryName)
+    return {"categories": list(categoryNames.keys()), "products": list(products.values())}
+
+
+def encodeSearchCursor(productId):
+    # kursor je neprozirna vrednost za klijenta, a sadrzi id poslednjeg vracenog proizvoda (keyset paginacija)
+    return base64.urlsafe_b64encode(json.dumps({"productId": productId}).encode()).decode()
+
+
+def decodeSearchCursor(cursor):
+    try:
+        productId = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())["productId"]
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+        return None
+    if type(productId) is not int or productId < 0:
+        return None
+    return productId
+
+
+def streamSearchResult(searchRows, additionalFields=None):
+    # redovi moraju biti grupisani po proizvodu; svaki proizvod se salje cim su procitani svi njegovi redovi, a
+    # kategorije (koje su poznate tek na kraju) se salju posle proizvoda
+    categoryNames = dict()
+    currentProduct = None
+    yield '{"products": ['
+    for searchRow in searchRows:
+        categoryNames[searchRow.CategoryName] = None
+        if currentProduct is not None and currentProduct["id"] == searchRow.ProductId:
+            currentProduct["categories"].append(searchRow.CategoryName)
+            continue
+        if currentProduct is not None:
+            yield json.dumps(currentProduct, sort_keys=True) + ", "
+        currentProduct = createProductDictionary(searchRow)
+    if currentProduct is not None:
+        yield json.dumps(currentProduct, sort_keys=True)
+    yield '], "categories": ' + json.dumps(list(categoryNames.keys()))
+    for fieldName, fieldValue in (additionalFields or dict()).items():
+        yield ", " + json.dumps(fieldName) + ": " + json.dumps(fieldValue)
+    yield "}"
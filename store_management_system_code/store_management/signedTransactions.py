@@ -0,0 +1,85 @@
+from configuration import getWeb3
+from contractProxies import getOrderContract
+from web3 import Web3
+from eth_account import Account
+from hexbytes import HexBytes
+from web3.exceptions import ContractLogicError
+
+import rlp
+
+# kupac moze sam da potpise transakciju za placanje ili potvrdu isporuke, pa server ne mora da desifruje njegove
+# kljuceve (Account.decrypt namerno trosi mnogo procesorskog vremena); server samo proverava da transakcija poziva
+# odgovarajucu funkciju ugovora bas te narudzbine, da ju je potpisao kupac narudzbine za lanac na koji je povezan
+# server i salje je u blockchain
+
+# polozaj id-a lanca, primaoca, vrednosti i podataka u RLP listi za legacy, EIP-2930 (tip 1) i EIP-1559 (tip 2)
+# transakcije; legacy transakcija nema polje za id lanca, vec je on sadrzan u v delu potpisa (EIP-155)
+TRANSACTION_FIELD_INDEXES = {
+    None: (6, 3, 4, 5),
+    1: (0, 4, 5, 6),
+    2: (0, 5, 6, 7)
+}
+
+
+def decodeSignedTransaction(signedTransaction):
+    rawTransaction = HexBytes(signedTransaction)
+    # tipizirane transakcije (EIP-2718) pocinju bajtom tipa, a legacy transakcije RLP listom (bajt >= 0xc0)
+    transactionType = rawTransaction[0] if rawTransaction[0] <= 0x7f else None
+    chainIdIndex, toIndex, valueIndex, dataIndex = TRANSACTION_FIELD_INDEXES[transactionType]
+    transactionFields = rlp.decode(rawTransaction if transactionType is None else rawTransaction[1:])
+
+    chainId = int.from_bytes(transactionFields[chainIdIndex], "big")
+    if transactionType is None:
+        # potpis bez id-a lanca (v je 27 ili 28) vazi na svakom lancu, pa se takva transakcija ne prihvata
+        chainId = (chainId - 35) // 2 if chainId >= 35 else None
+    transaction = {
+        "chainId": chainId,
+        "to": Web3.to_checksum_address(transactionFields[toIndex]),
+        "value": int.from_bytes(transactionFields[valueIndex], "big"),
+        "data": HexBytes(transactionFields[dataIndex]).hex(),
+        "from": Account.recover_transaction(rawTransaction)
+    }
+    return rawTransaction, transaction
+
+
+def sendSignedOrderTransaction(signedTransaction, order, functionName, valueInWei):
+    try:
+        rawTransaction, transaction = decodeSignedTransaction(signedTransaction)
+        contractAddress = transaction["to"]
+        ethereumContractDeployed = getOrderContract(order.ethereumContractAddress)
+        contractFunction, functionArguments = ethereumContractDeployed.decode_function_input(transaction["data"])
+    except Exception:
+        # neispravan hex, RLP ili potpis, nepoznat tip transakcije, transakcija bez primaoca ili nepoznat selektor
+        # funkcije
+        return "Invalid transaction.", None
+
+    if contractAddress != order.ethereumContractAddress or contractFunction.fn_name != functionName or \
+            functionArguments["orderId"] != order.id or transaction["value"] != valueInWei:
+        return "Invalid transaction.", None
+    # narudzbine upisane pre kolone customerEthereumAddress nemaju adresu kupca, pa se za njih koriste kljucevi
+    if order.customerEthereumAddress is None or \
+            transaction["from"] != Web3.to_checksum_address(order.customerEthereumAddress) or \
+            transaction["chainId"] != getWeb3().eth.chain_id:
+        return "Invalid transaction.", None
+
+    try:
+        # transakcija se najpre izvrsava bez upisa u blockchain, kako bi kupac dobio razlog odbijanja (revert) kao i
+        # kada server sam potpisuje transakciju
+        getWeb3().eth.call({
+            "from": transaction["from"],
+            "to": contractAddress,
+            "data": transaction["data"],
+            "value": transaction["value"]
+        })
+    except ContractLogicError as contractLogicError:
+        contractLogicErrorString = str(contractLogicError)
+        return contractLogicErrorString[contractLogicErrorString.find("revert ") + 7:], None
+    except ValueError:
+        # cvor je odbio poziv iz drugog razloga (npr. kupac nema dovoljno sredstava)
+        return "Invalid transaction.", None
+
+    try:
+        return "", getWeb3().eth.send_raw_transaction(rawTransaction)
+    except ValueError:
+        # cvor je odbio transakciju (npr. nonce je vec iskoriscen ili je cena gasa preniska)
+        return "Invalid transaction.", None
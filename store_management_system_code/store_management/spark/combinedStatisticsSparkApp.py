@@ -0,0 +1,43 @@
+from pyspark.sql import functions as func
+from sparkConfiguration import createSparkSession
+from storeDataReader import readOrderLines
+from productStatisticsSparkApp import readProducts, computeProductSales, createProductStatisticsResponse
+from categoryStatisticsSparkApp import readCategories, readProductCategories, computeCategorySales, \
+    createCategoryStatisticsResponse
+
+import json
+
+
+def getSales(spark):
+    # spojene stavke narudzbina se citaju i spajaju samo jednom i kesiraju, pa obe statistike koriste isti rezultat
+    # umesto da svaka ponovo cita productorder i orders
+    orderLineDataFrame = readOrderLines(spark).cache()
+    try:
+        productSales = computeProductSales(readProducts(spark), orderLineDataFrame).collect()
+        categorySales = computeCategorySales(
+            readCategories(spark), readProductCategories(spark), orderLineDataFrame
+        ).orderBy(
+            func.desc("Sold"), func.asc("CategoryName")
+        ).collect()
+    finally:
+        orderLineDataFrame.unpersist()
+    return productSales, categorySales
+
+
+def getStatistics(spark):
+    productSales, categorySales = getSales(spark)
+    return {
+        "products": createProductStatisticsResponse(productSales)["statistics"],
+        "categories": createCategoryStatisticsResponse(categorySales)["statistics"]
+    }
+
+
+if __name__ == "__main__":
+    # samostalno pokretanje preko spark-submit-a, servis za statistiku umesto toga poziva getStatistics()
+    # nad svojom SparkSession koja je aktivna sve vreme rada servisa
+    sparkSession = createSparkSession("Combined statistics spark app.")
+
+    with open("/app/store_management/spark/combinedStatisticsTempFile.txt", "w") as combinedStatisticsFile:
+        combinedStatisticsFile.write(json.dumps(getStatistics(sparkSession)))
+
+    sparkSession.stop()
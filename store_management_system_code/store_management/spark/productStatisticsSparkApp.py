@@ -1,74 +1,55 @@
-from pyspark.sql import SparkSession
 from pyspark.sql import functions as func
+from sparkConfiguration import createSparkSession
+from storeDataReader import readStoreTable, readOrderLines
 
-import os
 import json
 
-PRODUCTION = True if "PRODUCTION" in os.environ else False
-DATABASE_URL = os.environ["DATABASE_URL"] if "DATABASE_URL" in os.environ else "localhost"
-DATABASE_USERNAME = os.environ["DATABASE_USERNAME"] if "DATABASE_USERNAME" in os.environ else "root"
-DATABASE_PASSWORD = os.environ["DATABASE_PASSWORD"] if "DATABASE_PASSWORD" in os.environ else "root"
 
-builder = SparkSession.builder.appName("Product statistics spark app.")
+def readProducts(spark):
+    return readStoreTable(spark, "products", ["id", "productName"], partitionColumn="id")
 
-# local[*] means "utilize all available processor cores"
-if not PRODUCTION:
-    builder = builder.master("local[*]").config("spark.driver.extraClassPath",
-                                                "/app/store_management/spark/mysql-connector-j-8.0.33.jar")
 
-spark = builder.getOrCreate()
+def computeProductSales(productDataFrame, orderLineDataFrame):
+    return productDataFrame.join(
+        orderLineDataFrame, productDataFrame["id"] == orderLineDataFrame["productId"]
+    ).groupBy(
+        productDataFrame["id"].alias("ProductId"),
+        productDataFrame["productName"].alias("ProductName")
+    ).agg(
+        func.sum(
+            func.when(orderLineDataFrame["orderStatus"] == "COMPLETE", orderLineDataFrame["quantity"]).otherwise(0)
+        ).alias("Sold"),
+        func.sum(
+            func.when(orderLineDataFrame["orderStatus"] != "COMPLETE", orderLineDataFrame["quantity"]).otherwise(0)
+        ).alias("Waiting")
+    )
 
-productDataFrame = spark.read \
-    .format("jdbc") \
-    .option("driver", "com.mysql.cj.jdbc.Driver") \
-    .option("url", f"jdbc:mysql://{DATABASE_URL}:3306/store") \
-    .option("dbtable", "store.products") \
-    .option("user", DATABASE_USERNAME) \
-    .option("password", DATABASE_PASSWORD) \
-    .load()
 
-productOrderDataFrame = spark.read \
-    .format("jdbc") \
-    .option("driver", "com.mysql.cj.jdbc.Driver") \
-    .option("url", f"jdbc:mysql://{DATABASE_URL}:3306/store") \
-    .option("dbtable", "store.productorder") \
-    .option("user", DATABASE_USERNAME) \
-    .option("password", DATABASE_PASSWORD) \
-    .load()
+def getProductSales(spark):
+    return computeProductSales(readProducts(spark), readOrderLines(spark))
 
-orderDataFrame = spark.read \
-    .format("jdbc") \
-    .option("driver", "com.mysql.cj.jdbc.Driver") \
-    .option("url", f"jdbc:mysql://{DATABASE_URL}:3306/store") \
-    .option("dbtable", "store.orders") \
-    .option("user", DATABASE_USERNAME) \
-    .option("password", DATABASE_PASSWORD) \
-    .load()
 
-productStatistics = productDataFrame.join(
-    productOrderDataFrame, productDataFrame["id"] == productOrderDataFrame["productId"]
-).join(
-    orderDataFrame, productOrderDataFrame["orderId"] == orderDataFrame["id"]
-).groupBy(
-    productDataFrame["productName"].alias("ProductName")
-).agg(
-    func.sum(
-        func.when(orderDataFrame["orderStatus"] == "COMPLETE", productOrderDataFrame["quantity"]).otherwise(0)
-    ).alias("Sold"),
-    func.sum(
-        func.when(orderDataFrame["orderStatus"] != "COMPLETE", productOrderDataFrame["quantity"]).otherwise(0)
-    ).alias("Waiting")
-).collect()
+def createProductStatisticsResponse(productStatistics):
+    productStatisticsResponse = {"statistics": []}
+    for row in productStatistics:
+        productStatisticsResponse["statistics"].append({
+            "name": row["ProductName"],
+            "sold": int(row["Sold"]),
+            "waiting": int(row["Waiting"])
+        })
+    return productStatisticsResponse
 
-productStatisticsResponse = {"statistics": []}
-for row in productStatistics:
-    productStatisticsResponse["statistics"].append({
-        "name": row["ProductName"],
-        "sold": int(row["Sold"]),
-        "waiting": int(row["Waiting"])
-    })
 
-with open("/app/store_management/spark/productStatisticsTempFile.txt", "w") as productStatisticsFile:
-    productStatisticsFile.write(json.dumps(productStatisticsResponse))
+def getProductStatistics(spark):
+    return createProductStatisticsResponse(getProductSales(spark).collect())
 
-spark.stop()
+
+if __name__ == "__main__":
+    # samostalno pokretanje preko spark-submit-a, servis za statistiku umesto toga poziva getProductStatistics()
+    # nad svojom SparkSession koja je aktivna sve vreme rada servisa
+    sparkSession = createSparkSession("Product statistics spark app.")
+
+    with open("/app/store_management/spark/productStatisticsTempFile.txt", "w") as productStatisticsFile:
+        productStatisticsFile.write(json.dumps(getProductStatistics(sparkSession)))
+
+    sparkSession.stop()
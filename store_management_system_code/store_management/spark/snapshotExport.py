@@ -0,0 +1,115 @@
+from sparkConfiguration import SparkConfiguration, createSparkSession
+from storeDataReader import readJdbcTable, readSnapshotMetadata, SNAPSHOT_METADATA_FILE_NAME
+from storeDatabase import readStoreDataVersion
+from pyspark.sql import functions as func
+
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+# u tabele products, categories, productcategory i productorder se redovi samo dodaju, pa se one izvoze inkrementalno
+# na osnovu najveceg vec izvezenog id-a; orders se uvek izvozi cela (samo id i orderStatus), jer se status menja
+APPEND_ONLY_TABLES = {
+    "products": ["id", "productName"],
+    "categories": ["id", "categoryName"],
+    "productcategory": ["id", "productId", "categoryId"],
+    "productorder": ["id", "productId", "orderId", "quantity"]
+}
+MUTABLE_TABLES = {
+    "orders": ["id", "orderStatus"]
+}
+
+snapshotExportLock = threading.Lock()
+
+
+def writeSnapshotMetadata(snapshotMetadata):
+    # metadata se upisuje u privremeni fajl i zatim atomicno zamenjuje, pa citaoci nikada ne vide polovican upis
+    metadataFilePath = os.path.join(SparkConfiguration.SNAPSHOT_DIRECTORY, SNAPSHOT_METADATA_FILE_NAME)
+    with open(metadataFilePath + ".tmp", "w") as metadataFile:
+        metadataFile.write(json.dumps(snapshotMetadata))
+    os.replace(metadataFilePath + ".tmp", metadataFilePath)
+
+
+def exportTable(spark, tableName, columns, tablePath, mode, watermark):
+    condition = None if watermark is None else f"id > {watermark}"
+    dataFrame = readJdbcTable(spark, tableName, columns, partitionColumn="id", condition=condition).cache()
+    try:
+        dataFrame.write.mode(mode).parquet(os.path.join(SparkConfiguration.SNAPSHOT_DIRECTORY, tablePath))
+        maximumId = dataFrame.agg(func.max("id")).collect()[0][0]
+    finally:
+        dataFrame.unpersist()
+    return watermark if maximumId is None else maximumId
+
+
+def exportSnapshot(spark, full=False):
+    # redovi cija transakcija jos nije potvrdjena u trenutku izvoza, a imaju manji id od vec izvezenih, nece biti
+    # obuhvaceni inkrementalnim izvozom; povremeni potpun izvoz to ispravlja
+    with snapshotExportLock:
+        os.makedirs(SparkConfiguration.SNAPSHOT_DIRECTORY, exist_ok=True)
+        previousSnapshotMetadata = readSnapshotMetadata()
+        if previousSnapshotMetadata is None:
+            full = True
+        exportNumber = 0 if previousSnapshotMetadata is None else previousSnapshotMetadata["exportNumber"] + 1
+
+        # verzija se cita pre izvoza, pa snapshot sadrzi sve izmene do te verzije (a mozda i neke novije)
+        snapshotMetadata = {"version": readStoreDataVersion(), "exportNumber": exportNumber, "tables": dict()}
+        obsoleteTablePaths = []
+
+        for tableName, columns in APPEND_ONLY_TABLES.items():
+            if full:
+                tablePath = f"{tableName}-{exportNumber}"
+                watermark = exportTable(spark, tableName, columns, tablePath, "overwrite", None)
+                if previousSnapshotMetadata is not None:
+                    obsoleteTablePaths.append(previousSnapshotMetadata["tables"][tableName]["path"])
+            else:
+                tablePath = previousSnapshotMetadata["tables"][tableName]["path"]
+                previousWatermark = previousSnapshotMetadata["tables"][tableName]["watermark"]
+                watermark = exportTable(spark, tableName, columns, tablePath, "append", previousWatermark)
+            snapshotMetadata["tables"][tableName] = {"path": tablePath, "watermark": watermark}
+
+        for tableName, columns in MUTABLE_TABLES.items():
+            tablePath = f"{tableName}-{exportNumber}"
+            watermark = exportTable(spark, tableName, columns, tablePath, "overwrite", None)
+            if previousSnapshotMetadata is not None:
+                obsoleteTablePaths.append(previousSnapshotMetadata["tables"][tableName]["path"])
+            snapshotMetadata["tables"][tableName] = {"path": tablePath, "watermark": watermark}
+
+        writeSnapshotMetadata(snapshotMetadata)
+
+        # stari direktorijumi se brisu tek kada novi metadata pokazuje na nove, kako posao koji je vec poceo
+        # citanje ne bi ostao bez fajlova pre nego sto ih procita
+        for obsoleteTablePath in obsoleteTablePaths:
+            shutil.rmtree(os.path.join(SparkConfiguration.SNAPSHOT_DIRECTORY, obsoleteTablePath), ignore_errors=True)
+
+        return snapshotMetadata
+
+
+def readSnapshotVersion():
+    snapshotMetadata = readSnapshotMetadata()
+    return -1 if snapshotMetadata is None else snapshotMetadata["version"]
+
+
+def startPeriodicSnapshotExport(spark):
+    # snapshot se izvozi odmah pri pokretanju servisa (do tada se podaci citaju iz baze), a zatim na svakih
+    # SNAPSHOT_EXPORT_INTERVAL sekundi
+    def exportPeriodically():
+        while True:
+            try:
+                exportSnapshot(spark)
+            except Exception as exception:
+                print(f"Store snapshot export failed: {exception}", file=sys.stderr)
+            if SparkConfiguration.SNAPSHOT_EXPORT_INTERVAL <= 0:
+                return
+            time.sleep(SparkConfiguration.SNAPSHOT_EXPORT_INTERVAL)
+
+    threading.Thread(target=exportPeriodically, daemon=True).start()
+
+
+if __name__ == "__main__":
+    # samostalno pokretanje preko spark-submit-a; argument "full" zahteva potpun izvoz svih tabela
+    sparkSession = createSparkSession("Store snapshot export spark app.")
+    exportSnapshot(sparkSession, full=len(sys.argv) > 1 and sys.argv[1] == "full")
+    sparkSession.stop()
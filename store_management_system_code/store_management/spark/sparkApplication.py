@@ -1,33 +1,87 @@
-from flask import Flask
-import os
-import subprocess
+from flask import Flask, Response, jsonify, request
+from sparkConfiguration import SparkConfiguration, createSparkSession
+from productStatisticsSparkApp import getProductStatistics
+from categoryStatisticsSparkApp import getCategoryStatistics
+from combinedStatisticsSparkApp import getStatistics, getSales
+from storeDatabase import readProductStatistics, readCategoryStatistics, replaceSalesStatistics, \
+    readStoreDataVersion
+from statisticsCache import StatisticsCache
+from snapshotExport import exportSnapshot, readSnapshotVersion, startPeriodicSnapshotExport
+from storeDataReader import getStoreDataSource
 
 application = Flask(__name__)
 
+# jedna SparkSession (i registracija executor-a na klasteru) se kreira pri pokretanju servisa i zivi koliko i sam
+# Flask proces, tako da svaki zahtev za statistiku placa samo izvrsavanje upita, a ne podizanje novog driver-a
+spark = createSparkSession("Store statistics spark app.")
+
+
+def readStatisticsDataVersion():
+    # kada spark poslovi citaju snapshot, kesirani rezultati zavise od verzije snapshot-a (verzija baze u trenutku
+    # izvoza), a ne od trenutne verzije baze; dok snapshot ne postoji, poslovi citaju bazu
+    if SparkConfiguration.STATISTICS_SOURCE == "spark" and getStoreDataSource() == "snapshot":
+        return readSnapshotVersion()
+    return readStoreDataVersion()
+
+
+statisticsCache = StatisticsCache(readStatisticsDataVersion, SparkConfiguration.STATISTICS_CACHE_MAXIMUM_STALENESS)
+
+if SparkConfiguration.SPARK_DATA_SOURCE == "snapshot":
+    startPeriodicSnapshotExport(spark)
+
+
+def computeProductStatistics():
+    if SparkConfiguration.STATISTICS_SOURCE == "spark":
+        return getProductStatistics(spark)
+    return readProductStatistics()
+
+
+def computeCategoryStatistics():
+    if SparkConfiguration.STATISTICS_SOURCE == "spark":
+        return getCategoryStatistics(spark)
+    return readCategoryStatistics()
+
+
+def computeStatistics():
+    if SparkConfiguration.STATISTICS_SOURCE == "spark":
+        return getStatistics(spark)
+    return {
+        "products": readProductStatistics()["statistics"],
+        "categories": readCategoryStatistics()["statistics"]
+    }
+
 
 @application.route("/product_statistics", methods=["GET"])
 def product_statistics():
-    os.environ["SPARK_APPLICATION_PYTHON_LOCATION"] = "/app/store_management/spark/productStatisticsSparkApp.py"
-    os.environ["SPARK_SUBMIT_ARGS"] = \
-        "--driver-class-path /app/store_management/spark/mysql-connector-j-8.0.33.jar" \
-        " --jars /app/store_management/spark/mysql-connector-j-8.0.33.jar"
-    subprocess.check_output(["/template.sh"])
-    with open("/app/store_management/spark/productStatisticsTempFile.txt", "r") as productStatisticsFile:
-        productStatistics = productStatisticsFile.read()
-    return productStatistics
+    return jsonify(statisticsCache.get("product_statistics", computeProductStatistics)), 200
 
 
 @application.route("/category_statistics", methods=["GET"])
 def category_statistics():
-    os.environ["SPARK_APPLICATION_PYTHON_LOCATION"] = "/app/store_management/spark/categoryStatisticsSparkApp.py"
-    os.environ["SPARK_SUBMIT_ARGS"] = \
-        "--driver-class-path /app/store_management/spark/mysql-connector-j-8.0.33.jar" \
-        " --jars /app/store_management/spark/mysql-connector-j-8.0.33.jar"
-    subprocess.check_output(["/template.sh"])
-    with open("/app/store_management/spark/categoryStatisticsTempFile.txt", "r") as categoryStatisticsFile:
-        categoryStatistics = categoryStatisticsFile.read()
-    return categoryStatistics
+    return jsonify(statisticsCache.get("category_statistics", computeCategoryStatistics)), 200
+
+
+@application.route("/statistics", methods=["GET"])
+def statistics():
+    return jsonify(statisticsCache.get("statistics", computeStatistics)), 200
+
+
+@application.route("/rebuild_statistics", methods=["POST"])
+def rebuild_statistics():
+    # materijalizovane tabele se ne smeju graditi iz zastarelog snapshot-a
+    if SparkConfiguration.SPARK_DATA_SOURCE == "snapshot":
+        exportSnapshot(spark)
+    productSales, categorySales = getSales(spark)
+    replaceSalesStatistics(productSales, categorySales)
+    return Response(status=200)
+
+
+@application.route("/export_snapshot", methods=["POST"])
+def export_snapshot():
+    snapshotMetadata = exportSnapshot(spark, full=request.args.get("full", "false") == "true")
+    return jsonify(snapshotMetadata), 200
 
 
 if __name__ == "__main__":
-    application.run(debug=True, host="0.0.0.0", port=5004)
+    # reloader bi pokrenuo novi proces, a samim tim i jos jednu SparkSession
+    application.run(debug=True, use_reloader=False, host="0.0.0.0", port=SparkConfiguration.SPARK_APPLICATION_PORT)
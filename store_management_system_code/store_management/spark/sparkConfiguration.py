@@ -0,0 +1,49 @@
+from pyspark.sql import SparkSession
+
+import os
+
+
+class SparkConfiguration:
+    PRODUCTION = True if "PRODUCTION" in os.environ else False
+    SPARK_APPLICATION_PORT = 5004
+
+    DATABASE_URL = os.environ["DATABASE_URL"] if "DATABASE_URL" in os.environ else "localhost"
+    DATABASE_USERNAME = os.environ["DATABASE_USERNAME"] if "DATABASE_USERNAME" in os.environ else "root"
+    DATABASE_PASSWORD = os.environ["DATABASE_PASSWORD"] if "DATABASE_PASSWORD" in os.environ else "root"
+
+    MYSQL_CONNECTOR_JAR_PATH = "/app/store_management/spark/mysql-connector-j-8.0.33.jar"
+
+    # tabele se citaju preko vise paralelnih JDBC konekcija (po jedna za svaku particiju opsega id kolone), kako bi
+    # citanje bilo rasporedjeno na sve worker-e klastera
+    JDBC_NUMBER_OF_PARTITIONS = int(os.environ["JDBC_NUMBER_OF_PARTITIONS"]) \
+        if "JDBC_NUMBER_OF_PARTITIONS" in os.environ else 4
+    JDBC_FETCH_SIZE = int(os.environ["JDBC_FETCH_SIZE"]) if "JDBC_FETCH_SIZE" in os.environ else 10000
+
+    # "jdbc" - spark poslovi citaju tabele direktno iz baze prodavnice
+    # "snapshot" - spark poslovi citaju parquet snapshot baze, pa analitika uopste ne opterecuje bazu
+    SPARK_DATA_SOURCE = os.environ["SPARK_DATA_SOURCE"] if "SPARK_DATA_SOURCE" in os.environ else "jdbc"
+    # direktorijum mora biti deljen izmedju servisa za statistiku i svih worker-a klastera
+    SNAPSHOT_DIRECTORY = os.environ["SNAPSHOT_DIRECTORY"] if "SNAPSHOT_DIRECTORY" in os.environ \
+        else "/app/store_management/spark/snapshot"
+    # na koliko sekundi se u pozadini radi inkrementalni izvoz snapshot-a, 0 znaci samo jedan izvoz pri pokretanju
+    SNAPSHOT_EXPORT_INTERVAL = float(os.environ["SNAPSHOT_EXPORT_INTERVAL"]) \
+        if "SNAPSHOT_EXPORT_INTERVAL" in os.environ else 0.0
+
+    # "aggregates" - statistika se cita iz materijalizovanih tabela productstatistics i categorystatistics
+    # "spark" - statistika se racuna spark poslom nad svim tabelama prodavnice
+    STATISTICS_SOURCE = os.environ["STATISTICS_SOURCE"] if "STATISTICS_SOURCE" in os.environ else "aggregates"
+
+    # broj sekundi tokom kojih se kesirana statistika vraca bez provere verzije podataka prodavnice
+    STATISTICS_CACHE_MAXIMUM_STALENESS = float(os.environ["STATISTICS_CACHE_MAXIMUM_STALENESS"]) \
+        if "STATISTICS_CACHE_MAXIMUM_STALENESS" in os.environ else 0.0
+
+
+def createSparkSession(applicationName):
+    builder = SparkSession.builder.appName(applicationName)
+
+    # local[*] means "utilize all available processor cores"
+    if not SparkConfiguration.PRODUCTION:
+        builder = builder.master("local[*]").config("spark.driver.extraClassPath",
+                                                    SparkConfiguration.MYSQL_CONNECTOR_JAR_PATH)
+
+    return builder.getOrCreate()
@@ -0,0 +1,61 @@
+from concurrent.futures import Future
+
+import threading
+import time
+
+
+class StatisticsCacheEntry:
+    def __init__(self, version, result):
+        self.version = version
+        self.result = result
+        self.validatedAt = time.monotonic()
+
+
+class StatisticsCache:
+    # rezultati statistike se kesiraju po verziji podataka prodavnice; istovremeni zahtevi za istu statistiku i istu
+    # verziju cekaju na jedno izracunavanje koje je vec u toku umesto da svaki pokrene svoj posao
+    def __init__(self, readVersion, maximumStaleness):
+        self.readVersion = readVersion
+        self.maximumStaleness = maximumStaleness
+        self.lock = threading.Lock()
+        self.entries = dict()
+        self.computationsInProgress = dict()
+
+    def get(self, name, compute):
+        with self.lock:
+            entry = self.entries.get(name, None)
+            # u okviru dozvoljene zastarelosti rezultat se vraca bez citanja verzije iz baze
+            if entry is not None and time.monotonic() - entry.validatedAt <= self.maximumStaleness:
+                return entry.result
+
+        version = self.readVersion()
+
+        with self.lock:
+            entry = self.entries.get(name, None)
+            if entry is not None and entry.version == version:
+                entry.validatedAt = time.monotonic()
+                return entry.result
+            computation = self.computationsInProgress.get((name, version), None)
+            isLeader = computation is None
+            if isLeader:
+                computation = Future()
+                self.computationsInProgress[(name, version)] = computation
+
+        if not isLeader:
+            return computation.result()
+
+        try:
+            result = compute()
+        except Exception as exception:
+            with self.lock:
+                del self.computationsInProgress[(name, version)]
+            computation.set_exception(exception)
+            raise
+
+        with self.lock:
+            del self.computationsInProgress[(name, version)]
+            entry = self.entries.get(name, None)
+            if entry is None or entry.version <= version:
+                self.entries[name] = StatisticsCacheEntry(version, result)
+        computation.set_result(result)
+        return result
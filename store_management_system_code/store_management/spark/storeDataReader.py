@@ -0,0 +1,106 @@
+from sparkConfiguration import SparkConfiguration
+from storeDatabase import getStoreDatabaseConnection
+
+import json
+import os
+
+SNAPSHOT_METADATA_FILE_NAME = "snapshot.json"
+
+
+def readColumnBounds(tableName, columnName):
+    connection = getStoreDatabaseConnection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT MIN({columnName}), MAX({columnName}) FROM store.{tableName}")
+            return cursor.fetchone()
+    finally:
+        connection.close()
+
+
+def readJdbcTable(spark, tableName, columns, partitionColumn=None, condition=None):
+    # iz baze se citaju samo kolone potrebne za agregaciju, a uslov (npr. nad orderStatus) se izvrsava vec u MySQL-u
+    query = f"SELECT {', '.join(columns)} FROM store.{tableName}"
+    if condition is not None:
+        query += f" WHERE {condition}"
+
+    # MySQL Connector/J bez useCursorFetch ignorise fetchsize i ucitava ceo rezultat particije u memoriju executor-a,
+    # a sa njim redove cita u grupama od JDBC_FETCH_SIZE redova preko kursora na serveru
+    reader = spark.read \
+        .format("jdbc") \
+        .option("driver", "com.mysql.cj.jdbc.Driver") \
+        .option("url", f"jdbc:mysql://{SparkConfiguration.DATABASE_URL}:3306/store?useCursorFetch=true") \
+        .option("dbtable", f"({query}) AS {tableName}") \
+        .option("user", SparkConfiguration.DATABASE_USERNAME) \
+        .option("password", SparkConfiguration.DATABASE_PASSWORD) \
+        .option("fetchsize", SparkConfiguration.JDBC_FETCH_SIZE)
+
+    if partitionColumn is not None and SparkConfiguration.JDBC_NUMBER_OF_PARTITIONS > 1:
+        # granice sluze samo za podelu opsega na particije, redovi van njih svakako bivaju procitani
+        lowerBound, upperBound = readColumnBounds(tableName, partitionColumn)
+        if lowerBound is not None:
+            reader = reader \
+                .option("partitionColumn", partitionColumn) \
+                .option("lowerBound", lowerBound) \
+                .option("upperBound", upperBound + 1) \
+                .option("numPartitions", SparkConfiguration.JDBC_NUMBER_OF_PARTITIONS)
+
+    return reader.load()
+
+
+def readSnapshotMetadata():
+    metadataFilePath = os.path.join(SparkConfiguration.SNAPSHOT_DIRECTORY, SNAPSHOT_METADATA_FILE_NAME)
+    if not os.path.exists(metadataFilePath):
+        return None
+    with open(metadataFilePath, "r") as metadataFile:
+        return json.loads(metadataFile.read())
+
+
+def getStoreDataSource():
+    # dok prvi snapshot nije izvezen, podaci se citaju direktno iz baze, pa statistika radi i odmah po pokretanju
+    if SparkConfiguration.SPARK_DATA_SOURCE == "snapshot" and readSnapshotMetadata() is not None:
+        return "snapshot"
+    return "jdbc"
+
+
+def readSnapshotTable(spark, tableName, columns, condition=None):
+    snapshotMetadata = readSnapshotMetadata()
+    dataFrame = spark.read.parquet(
+        os.path.join(SparkConfiguration.SNAPSHOT_DIRECTORY, snapshotMetadata["tables"][tableName]["path"])
+    ).select(*columns)
+    if condition is not None:
+        dataFrame = dataFrame.filter(condition)
+    return dataFrame
+
+
+def readStoreTable(spark, tableName, columns, partitionColumn=None, condition=None, dataSource=None):
+    # uslov mora biti izraz koji vazi i u MySQL-u i u Spark SQL-u, jer se izvrsava nad onim izvorom koji je izabran
+    if dataSource is None:
+        dataSource = getStoreDataSource()
+    if dataSource == "snapshot":
+        return readSnapshotTable(spark, tableName, columns, condition)
+    return readJdbcTable(spark, tableName, columns, partitionColumn, condition)
+
+
+def readOrderLines(spark, onlyCompleteOrders=False):
+    # kada je potrebna samo prodata kolicina, uslov nad statusom se izvrsava u bazi, pa se stavke narudzbina koje
+    # nisu isporucene uopste ne prenose u spark
+    orderCondition = "orderStatus = 'COMPLETE'" if onlyCompleteOrders else None
+    # obe tabele se citaju iz istog izvora, i kada prvi snapshot bude izvezen izmedju dva citanja
+    dataSource = getStoreDataSource()
+    # podupit nije podrzan nad parquet fajlovima, tamo filtriranje stavki obavlja spajanje sa filtriranim orders
+    productOrderCondition = f"orderId IN (SELECT id FROM store.orders WHERE {orderCondition})" \
+        if onlyCompleteOrders and dataSource == "jdbc" else None
+
+    productOrderDataFrame = readStoreTable(
+        spark, "productorder", ["id", "productId", "orderId", "quantity"], partitionColumn="id",
+        condition=productOrderCondition, dataSource=dataSource
+    )
+    orderDataFrame = readStoreTable(
+        spark, "orders", ["id", "orderStatus"], partitionColumn="id", condition=orderCondition, dataSource=dataSource
+    )
+
+    return productOrderDataFrame.join(
+        orderDataFrame, productOrderDataFrame["orderId"] == orderDataFrame["id"]
+    ).select(
+        productOrderDataFrame["productId"], productOrderDataFrame["quantity"], orderDataFrame["orderStatus"]
+    )
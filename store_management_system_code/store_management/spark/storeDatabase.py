@@ -0,0 +1,96 @@
+from sparkConfiguration import SparkConfiguration
+
+import pymysql
+
+STORE_DATA_VERSION = "store"
+
+
+def getStoreDatabaseConnection():
+    return pymysql.connect(
+        host=SparkConfiguration.DATABASE_URL,
+        user=SparkConfiguration.DATABASE_USERNAME,
+        password=SparkConfiguration.DATABASE_PASSWORD,
+        database="store"
+    )
+
+
+def readStoreDataVersion():
+    connection = getStoreDatabaseConnection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT value FROM dataversions WHERE name = %s", (STORE_DATA_VERSION,))
+            row = cursor.fetchone()
+    finally:
+        connection.close()
+    return 0 if row is None else int(row[0])
+
+
+def readProductStatistics():
+    connection = getStoreDatabaseConnection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT products.productName, productstatistics.sold, productstatistics.waiting "
+                "FROM productstatistics JOIN products ON products.id = productstatistics.productId"
+            )
+            productStatistics = cursor.fetchall()
+    finally:
+        connection.close()
+
+    productStatisticsResponse = {"statistics": []}
+    for productName, sold, waiting in productStatistics:
+        productStatisticsResponse["statistics"].append({
+            "name": productName,
+            "sold": int(sold),
+            "waiting": int(waiting)
+        })
+    return productStatisticsResponse
+
+
+def readCategoryStatistics():
+    connection = getStoreDatabaseConnection()
+    try:
+        with connection.cursor() as cursor:
+            # kategorije bez ijedne narudzbine nemaju red u categorystatistics, ali se i dalje navode u statistici
+            cursor.execute(
+                "SELECT categories.categoryName, COALESCE(categorystatistics.sold, 0) "
+                "FROM categories LEFT JOIN categorystatistics ON categorystatistics.categoryId = categories.id"
+            )
+            categoryStatistics = cursor.fetchall()
+    finally:
+        connection.close()
+
+    # sortiranje se radi ovde, a ne u upitu, kako bi poredak imena bio isti kao u spark poslu (binarni, a ne po
+    # kolaciji baze)
+    categoryStatisticsResponse = {"statistics": []}
+    for categoryName, sold in sorted(categoryStatistics, key=lambda row: (-int(row[1]), row[0])):
+        categoryStatisticsResponse["statistics"].append(categoryName)
+    return categoryStatisticsResponse
+
+
+def replaceSalesStatistics(productSales, categorySales):
+    # potpuna ponovna izgradnja materijalizovanih tabela u jednoj transakciji; narudzbine koje stignu dok spark
+    # posao traje mogu biti izgubljene, pa ovu rekonsilijaciju treba pokretati kada u prodavnici nema saobracaja
+    connection = getStoreDatabaseConnection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM productstatistics")
+            cursor.execute("DELETE FROM categorystatistics")
+            cursor.executemany(
+                "INSERT INTO productstatistics (productId, sold, waiting) VALUES (%s, %s, %s)",
+                [(row["ProductId"], int(row["Sold"]), int(row["Waiting"])) for row in productSales]
+            )
+            cursor.executemany(
+                "INSERT INTO categorystatistics (categoryId, sold, waiting) VALUES (%s, %s, %s)",
+                [(row["CategoryId"], int(row["Sold"]), int(row["Waiting"])) for row in categorySales]
+            )
+            cursor.execute(
+                "INSERT INTO dataversions (name, value) VALUES (%s, 1) ON DUPLICATE KEY UPDATE value = value + 1",
+                (STORE_DATA_VERSION,)
+            )
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
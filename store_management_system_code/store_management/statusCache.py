@@ -0,0 +1,127 @@
+from configuration import Configuration
+from collections import OrderedDict
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+# odgovor na /status se cuva po kupcu i parametrima zahteva, zajedno sa verzijom narudzbina kupca za koju je
+# izracunat; verzija se uvecava u svakoj transakciji koja menja narudzbine kupca (nova narudzbina, postavljen ugovor,
+# preuzimanje i isporuka), pa je sacuvan odgovor vazeci dok mu je verzija jednaka trenutnoj
+# verzija se cita pre racunanja odgovora, pa odgovor moze biti samo noviji od verzije uz koju je sacuvan
+
+
+def getStatusCacheKey(buyerEmail, requestArguments):
+    return buyerEmail + "?" + "&".join(
+        f"{name}={value}" for name, value in sorted(requestArguments.items(multi=True))
+    )
+
+
+def getStatusEntityTag(cacheKey, buyerDataVersion):
+    # ETag zavisi samo od kljuca i verzije, pa se 304 vraca bez citanja kesa i bez upita nad narudzbinama
+    return hashlib.sha256(f"{cacheKey}\n{buyerDataVersion}".encode()).hexdigest()[:32]
+
+
+class MemoryStatusCache:
+    # kes u memoriji jednog procesa, najvise STATUS_CACHE_SIZE odgovora
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        self.responses = OrderedDict()
+
+    def get(self, cacheKey, buyerDataVersion):
+        with self.lock:
+            cachedResponse = self.responses.get(cacheKey, None)
+            if cachedResponse is None or cachedResponse[0] != buyerDataVersion:
+                return None
+            self.responses.move_to_end(cacheKey)
+            return cachedResponse[1]
+
+    def set(self, cacheKey, buyerDataVersion, responseBody):
+        with self.lock:
+            self.responses[cacheKey] = (buyerDataVersion, responseBody)
+            self.responses.move_to_end(cacheKey)
+            while len(self.responses) > self.size:
+                self.responses.popitem(last=False)
+
+
+class FilesystemStatusCache:
+    # kes u direktorijumu koji dele svi procesi servisa (npr. zajednicki volume), jedan fajl po kljucu; fajl se
+    # upisuje pod privremenim imenom i zatim atomski preimenuje, pa citalac nikad ne vidi delimicno upisan odgovor
+    # u direktorijumu se cuva najvise STATUS_CACHE_SIZE odgovora, a kada ih ima vise brisu se najduze nekorisceni
+    # (vreme izmene fajla se pomera i pri citanju)
+    def __init__(self, directory, size):
+        self.directory = directory
+        self.size = size
+        os.makedirs(self.directory, exist_ok=True)
+
+    def getFilePath(self, cacheKey):
+        return os.path.join(self.directory, hashlib.sha256(cacheKey.encode()).hexdigest() + ".json")
+
+    def get(self, cacheKey, buyerDataVersion):
+        try:
+            with open(self.getFilePath(cacheKey), "r") as file:
+                cachedResponse = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if cachedResponse.get("key", None) != cacheKey or cachedResponse.get("version", None) != buyerDataVersion:
+            return None
+        try:
+            os.utime(self.getFilePath(cacheKey))
+        except OSError:
+            pass
+        return cachedResponse["body"]
+
+    def set(self, cacheKey, buyerDataVersion, responseBody):
+        fileDescriptor, temporaryFilePath = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fileDescriptor, "w") as file:
+                json.dump({"key": cacheKey, "version": buyerDataVersion, "body": responseBody}, file)
+            os.replace(temporaryFilePath, self.getFilePath(cacheKey))
+        except OSError:
+            # kes nije neophodan za odgovor, pa neuspeo upis samo znaci da ce odgovor biti ponovo izracunat
+            if os.path.exists(temporaryFilePath):
+                os.remove(temporaryFilePath)
+            return
+        self.evict()
+
+    def evict(self):
+        # vise procesa moze istovremeno brisati iste fajlove, pa se fajl koji je u medjuvremenu nestao preskace
+        cachedFiles = []
+        try:
+            with os.scandir(self.directory) as directoryEntries:
+                for directoryEntry in directoryEntries:
+                    if not directoryEntry.name.endswith(".json"):
+                        continue
+                    try:
+                        cachedFiles.append((directoryEntry.stat().st_mtime, directoryEntry.path))
+                    except OSError:
+                        pass
+        except OSError:
+            return
+        if len(cachedFiles) <= self.size:
+            return
+        cachedFiles.sort()
+        for _, filePath in cachedFiles[:len(cachedFiles) - self.size]:
+            try:
+                os.remove(filePath)
+            except OSError:
+                pass
+
+
+class DisabledStatusCache:
+    def get(self, cacheKey, buyerDataVersion):
+        return None
+
+    def set(self, cacheKey, buyerDataVersion, responseBody):
+        pass
+
+
+def createStatusCache():
+    if Configuration.STATUS_CACHE_BACKEND == "filesystem":
+        return FilesystemStatusCache(Configuration.STATUS_CACHE_DIRECTORY, Configuration.STATUS_CACHE_SIZE)
+    if Configuration.STATUS_CACHE_BACKEND == "memory":
+        return MemoryStatusCache(Configuration.STATUS_CACHE_SIZE)
+    return DisabledStatusCache()